@@ -1,65 +1,132 @@
 import random
-def check_immunity(ability_effect, move_type):
-    if ability_effect.startswith("immunity:"):
-        immune_type = ability_effect.split(":")[1]
-        return move_type == immune_type
-    return False
+from enum import IntEnum
+from typing import NamedTuple
 
-def prevent_status(ability_effect, status):
-    if ability_effect.startswith("prevent_status:"):
-        blocked = ability_effect.split(":")[1]
-        return status == blocked
-    return False
+from abilities import abilities
+from type_chart import NO_TYPE, type_id
+
+#what an ability does, everything the battle loop doesn't implement is OTHER
+class AbilityKind(IntEnum):
+    NONE = 0
+    IMMUNITY = 1
+    PREVENT_STATUS = 2
+    SPEED_IN_SUN = 3
+    SPEED_IN_RAIN = 4
+    ATTACK_IF_STATUS = 5
+    LOW_HP_TYPE_BOOST = 6
+    CONTACT_PARALYZE = 7
+    CONTACT_BURN = 8
+    CONTACT_INFATUATE = 9
+    ON_ENTRY_LOWER = 10
+    HEAL_ON_HIT = 11
+    OTHER = 12
+
+#an ability's effect string parsed once. type_id is the immune/boosted/absorbed type,
+#param is the stat or status name for the ones that have one
+class AbilityEffect(NamedTuple):
+    kind: AbilityKind
+    type_id: int = NO_TYPE
+    param: str = None
+    effect: str = ''
+
+NO_ABILITY = AbilityEffect(AbilityKind.NONE)
+
+#plain module names for the hot checks, AbilityKind.X goes through the enum machinery every time
+IMMUNITY = AbilityKind.IMMUNITY
+PREVENT_STATUS = AbilityKind.PREVENT_STATUS
+SPEED_IN_SUN = AbilityKind.SPEED_IN_SUN
+SPEED_IN_RAIN = AbilityKind.SPEED_IN_RAIN
+ATTACK_IF_STATUS = AbilityKind.ATTACK_IF_STATUS
+LOW_HP_TYPE_BOOST = AbilityKind.LOW_HP_TYPE_BOOST
+CONTACT_PARALYZE = AbilityKind.CONTACT_PARALYZE
+CONTACT_BURN = AbilityKind.CONTACT_BURN
+CONTACT_INFATUATE = AbilityKind.CONTACT_INFATUATE
+ON_ENTRY_LOWER = AbilityKind.ON_ENTRY_LOWER
+HEAL_ON_HIT = AbilityKind.HEAL_ON_HIT
+
+_SIMPLE_KINDS = {
+    "boost_spe_if_sun": AbilityKind.SPEED_IN_SUN,
+    "boost_spe_if_rain": AbilityKind.SPEED_IN_RAIN,
+    "boost_atk_if_status": AbilityKind.ATTACK_IF_STATUS,
+    "contact_paralyze": AbilityKind.CONTACT_PARALYZE,
+    "contact_burn": AbilityKind.CONTACT_BURN,
+    "chanceinfatuate": AbilityKind.CONTACT_INFATUATE,
+}
+_TYPE_KINDS = {
+    "immunity": AbilityKind.IMMUNITY,
+    "boost_type_if_lowhp": AbilityKind.LOW_HP_TYPE_BOOST,
+    "heal_on_hit": AbilityKind.HEAL_ON_HIT,
+}
+_PARAM_KINDS = {
+    "prevent_status": AbilityKind.PREVENT_STATUS,
+    "on_entry_lower": AbilityKind.ON_ENTRY_LOWER,
+}
 
-def modify_speed(mon, weather, ability_effect):
-    if ability_effect == "boost_spe_if_sun" and weather == "Sun":
+#prefixes are case sensitive like the old startswith checks were, so flash fire's
+#"Immunity:Fire" still doesn't make anything immune
+def compile_ability(effect):
+    if not effect:
+        return NO_ABILITY
+    if effect in _SIMPLE_KINDS:
+        return AbilityEffect(_SIMPLE_KINDS[effect], effect=effect)
+    prefix, _, arg = effect.partition(":")
+    if prefix in _TYPE_KINDS:
+        return AbilityEffect(_TYPE_KINDS[prefix], type_id(arg), effect=effect)
+    if prefix in _PARAM_KINDS:
+        return AbilityEffect(_PARAM_KINDS[prefix], param=arg, effect=effect)
+    return AbilityEffect(AbilityKind.OTHER, effect=effect)
+
+ABILITY_EFFECTS = {name: compile_ability(data.get("effect", "")) for name, data in abilities.items()}
+
+#what a set resolves its ability to, unknown names and None do nothing
+def ability_effect(name):
+    return ABILITY_EFFECTS.get(name, NO_ABILITY)
+
+def check_immunity(ability, move_type_id):
+    return ability.kind == IMMUNITY and move_type_id == ability.type_id
+
+def prevent_status(ability, status):
+    return ability.kind == PREVENT_STATUS and status == ability.param
+
+def modify_speed(mon, weather, ability):
+    if ability.kind == SPEED_IN_SUN and weather == "Sun":
         return mon.stats["spe"] * 2
-    if ability_effect == "boost_spe_if_rain" and weather == "Rain":
+    if ability.kind == SPEED_IN_RAIN and weather == "Rain":
         return mon.stats["spe"] * 2
     return mon.stats["spe"]
 
-def modify_attack(mon, ability_effect, status_effects):
-    if ability_effect == "boost_atk_if_status":
-        if any([
-            status_effects.get(mon.name, {}).get("burned", False),
-            status_effects.get(mon.name, {}).get("poisoned", False),
-            status_effects.get(mon.name, {}).get("paralyzed", False),
-            status_effects.get(mon.name, {}).get("asleep", 0) > 0,
-            status_effects.get(mon.name, {}).get("confused", False),
-        ]):
+def modify_attack(mon, ability):
+    if ability.kind == ATTACK_IF_STATUS:
+        if mon.burned or mon.poisoned or mon.paralyzed or mon.asleep > 0 or mon.confused:
             return mon.stats["atk"] * 1.5
     return mon.stats["atk"]
 
-def boost_type_if_lowhp(mon, move_type, ability_effect, hp_ratio):
-    if ability_effect.startswith("boost_type_if_lowhp:"):
-        boost_type = ability_effect.split(":")[1]
-        if move_type == boost_type and hp_ratio < 0.333:
-            return 1.5
+def boost_type_if_lowhp(mon, move_type_id, ability, hp_ratio):
+    if ability.kind == LOW_HP_TYPE_BOOST and move_type_id == ability.type_id and hp_ratio < 0.333:
+        return 1.5
     return 1.0
 
-def apply_contact_ability(defender, attacker, ability_effect, status_effects):
-    if ability_effect == "contact_paralyze":
-        if random.random() <= 0.3:
-            status_effects[attacker.name]["paralyzed"] = True
+def apply_contact_ability(defender, attacker, ability, rng=random):
+    kind = ability.kind
+    if kind == CONTACT_PARALYZE:
+        if rng.random() <= 0.3:
+            attacker.paralyzed = True
             return "paralyzed"
-    if ability_effect == "contact_burn":
-        if random.random() <= 0.3:
-            status_effects[attacker.name]["burned"] = True
+    elif kind == CONTACT_BURN:
+        if rng.random() <= 0.3:
+            attacker.burned = True
             return "burned"
-    if ability_effect == "chanceinfatuate":
-        if random.random() <= 0.3:
-            status_effects[attacker.name]["infatuated"] = True
+    elif kind == CONTACT_INFATUATE:
+        if rng.random() <= 0.3:
+            attacker.infatuated = True
             return "infatuated"
     return None
 
-def on_entry_lower_stat(ability_effect, stat, target_stats):
-    if ability_effect == f"on_entry_lower:{stat}":
+def on_entry_lower_stat(ability, stat, target_stats):
+    if ability.kind == ON_ENTRY_LOWER and ability.param == stat:
         target_stats[stat] = max(1, int(target_stats[stat] * 0.67))  # reduce stat
         return True
     return False
 
-def should_heal_on_hit(ability_effect, move_type):
-    if ability_effect.startswith("heal_on_hit:"):
-        heal_type = ability_effect.split(":")[1]
-        return move_type == heal_type
-    return False
+def should_heal_on_hit(ability, move_type_id):
+    return ability.kind == HEAL_ON_HIT and move_type_id == ability.type_id
@@ -0,0 +1,384 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from ability_effects import (
+    IMMUNITY, ATTACK_IF_STATUS, LOW_HP_TYPE_BOOST, CONTACT_PARALYZE, CONTACT_BURN, CONTACT_INFATUATE,
+    ON_ENTRY_LOWER, HEAL_ON_HIT
+)
+from damage import BASE_CRIT_CHANCE, LEVEL_FACTOR
+from move_table import (
+    MOVES, NO_MOVE, STATUSES, SPECIAL, STATUS,
+    INFATUATE, CONFUSE, PARALYZE, TOXIC, SLEEP, HEAL, RAIN, SUN, PROTECT, SUBSTITUTE
+)
+from pokemon import STAT_KEYS, STATUS_KEYS, COUNTER_STATUSES
+from script import EFFECT_SPEECH, MAX_TURNS
+from type_chart import NO_TYPE, TYPE_EFF
+
+#same codes as tournament.WINNERS
+PLAYER_WIN, ENEMY_WIN, DRAW = 0, 1, 2
+
+HP, ATK, DEF, SPA, SPD, SPE = range(len(STAT_KEYS))
+#choose_best_move skips moves the defender is immune to, they get a score nothing else can reach
+IMMUNE_SCORE = -10 ** 6
+NO_CURE, CURE_ALL = -2, -1
+#secondary status code -> STATUS_KEYS index, -1 for the ones run_battle doesn't track (freeze, crit_boost)
+SECONDARY_FIELD = np.array([STATUS_KEYS.index(s) if s in STATUS_KEYS else -1 for s in STATUSES], dtype=np.int64)
+CONTACT_FIELDS = ((CONTACT_PARALYZE, 'paralyzed'), (CONTACT_BURN, 'burned'), (CONTACT_INFATUATE, 'infatuated'))
+
+#everything run_battle would look up on a set, as arrays indexed by set (rows of `sets`),
+#plus the set-vs-set tables should_switch and choose_best_move boil down to
+class BatchTables:
+    def __init__(self, sets):
+        self.sets = list(sets)
+        n_moves = max(len(s.moves) for s in self.sets)
+        self.stats = np.array([[s.stats[k] for k in STAT_KEYS] for s in self.sets], dtype=np.int64)
+        self.moves = np.array([list(s.moves) + [NO_MOVE] * (n_moves - len(s.moves)) for s in self.sets], dtype=np.int64)
+        has_move = np.array([[i < len(s.moves) for i in range(n_moves)] for s in self.sets])
+        self.type_ids = np.array([s.type_ids for s in self.sets], dtype=np.int64)
+        self.defense = np.array([s.defense for s in self.sets])
+
+        abilities = [s.ability_effect for s in self.sets]
+        self.ability_kind = np.array([a.kind for a in abilities], dtype=np.int64)
+        self.ability_type = np.array([a.type_id for a in abilities], dtype=np.int64)
+        self.lowered_stat = np.array([STAT_KEYS.index(a.param) if a.kind == ON_ENTRY_LOWER else -1 for a in abilities],
+                                     dtype=np.int64)
+
+        hooks = [s.item_hooks for s in self.sets]
+        self.low_hp_threshold = np.array([h.low_hp.threshold_hp if h.low_hp else -np.inf for h in hooks])
+        self.low_hp_heal = np.array([h.low_hp.heal if h.low_hp else 0 for h in hooks], dtype=np.int64)
+        self.cure = np.array([NO_CURE if h.status is None else CURE_ALL if h.status.status is None
+                              else STATUS_KEYS.index(h.status.status) if h.status.status in STATUS_KEYS else NO_CURE
+                              for h in hooks], dtype=np.int64)
+        self.boost_type = np.array([h.on_move.boost_type_id if h.on_move else -1 for h in hooks], dtype=np.int64)
+        self.boost_multiplier = np.array([h.on_move.multiplier if h.on_move else 1.0 for h in hooks])
+        self.crit_chance = np.array([h.on_move.crit_chance if h.on_move else BASE_CRIT_CHANCE for h in hooks])
+        self.end_turn_percent = np.array([h.end_turn.percent if h.end_turn else 0.0 for h in hooks])
+        self.shell_fraction = np.array([h.on_damage_dealt.fraction if h.on_damage_dealt else 0.0 for h in hooks])
+
+        type_eff = np.asarray(TYPE_EFF)
+        move_types = MOVES.type_id[self.moves].astype(np.int64)
+        move_power = MOVES.power[self.moves].astype(np.int64)
+        effects = MOVES.effect_code[self.moves]
+        self.move_effect = effects.astype(np.int64)
+        #[attacking set, move slot, defending set, defending type]
+        eff = type_eff[move_types[:, :, None, None], self.type_ids[None, None, :, :]]
+
+        #should_switch: [current set, opponent set] power of the opponent's moves that are super effective
+        #on us, and [candidate set, opponent set] whether any opponent move is resisted by the candidate
+        hits_us = (eff > 1.0).any(axis=3) & has_move[:, :, None]
+        self.threat = (hits_us * move_power[:, :, None]).sum(axis=1).T
+        self.resist = ((eff < 1.0).any(axis=3) & has_move[:, :, None]).any(axis=1).T
+
+        #choose_best_move: [attacker set, defender set, slot] score that doesn't change during a battle.
+        #stab, +3 per super effective defending type, and score_move's weather/protect bonuses
+        stab = ((move_types == self.type_ids[:, :1]) | (move_types == self.type_ids[:, 1:])) & (move_types != NO_TYPE)
+        score = 2 * stab[:, :, None] + 3 * (eff == 2.0).sum(axis=3)
+        water = np.array(['Water' in s.types for s in self.sets])[:, None]
+        fire = np.array(['Fire' in s.types for s in self.sets])[:, None]
+        score += (2 * (((effects == RAIN) & water) | ((effects == SUN) & fire) | (effects == PROTECT)))[:, :, None]
+        score = score.transpose(0, 2, 1).astype(np.int64)
+        immune = self.defense[:, move_types].transpose(1, 0, 2) == 0.0
+        score[immune | ~has_move[:, None, :]] = IMMUNE_SCORE
+        self.move_score = score
+
+class BatchResult(NamedTuple):
+    winners: np.ndarray     #PLAYER_WIN / ENEMY_WIN / DRAW per battle
+    turns: np.ndarray       #state.turn when it ended, same as BattleEndEvent.turn
+
+#n battles at once in lockstep, every battle's turn t gets played before any battle's turn t+1.
+#teams is (n, 2, team size) rows of tables.sets, player then enemy. all randomness comes from rng
+#(a numpy Generator), so this matches run_battle in distribution, not game by game.
+#
+#covers what run_battle does with the greedy AI: intimidate, should_switch, speed order, choose_best_move,
+#confusion/infatuation/paralysis/sleep/freeze, every item and ability hook, crits, the 16 rolls, secondary
+#and contact statuses, burn/poison after the hit, faint replacement, leftovers, and the turn limit.
+#weather is left out because it never starts in run_battle either (rain dance and sunny day are
+#status moves, which stop before the weather code), and focus band since it rolls but changes nothing
+def run_batch(tables, teams, rng, max_turns=MAX_TURNS):
+    teams = np.asarray(teams, dtype=np.int64)
+    n, _, size = teams.shape
+    #every mon gets a flat index (battle * 2 + side) * size + slot, all per-mon state is indexed by it
+    sets = teams.reshape(-1)
+    hp = np.full(len(sets), 100, dtype=np.int64)
+    stats = tables.stats[sets]
+    item_used = np.zeros(len(sets), dtype=bool)
+    status = {key: np.zeros(len(sets), dtype=np.int64 if key in COUNTER_STATUSES else bool) for key in STATUS_KEYS}
+    active = np.zeros((n, 2), dtype=np.int64)
+    battles = np.arange(n)
+
+    def mon(b, side, slot):
+        return (b * 2 + side) * size + slot
+
+    def active_mon(b, side):
+        return mon(b, side, active[b, side])
+
+    #start of battle, both leads' intimidate. stats are per mon here so nothing else sees the drop
+    for side in (0, 1):
+        source, target = mon(battles, side, 0), mon(battles, 1 - side, 0)
+        lowered = tables.lowered_stat[sets[source]]
+        hit = lowered >= 0
+        t, stat = target[hit], lowered[hit]
+        stats[t, stat] = np.maximum(1, np.floor(stats[t, stat] * 0.67).astype(np.int64))
+
+    def switch(b, side):
+        current = active[b, side]
+        cur, opp = mon(b, side, current), active_mon(b, 1 - side)
+        cur_hp = hp[cur]
+        stay = ((cur_hp < 30) & (stats[cur, SPE] >= stats[opp, SPE])) | (tables.threat[sets[cur], sets[opp]] >= cur_hp)
+        chosen = np.full(len(b), -1)
+        #first teammate in slot order that's up and resists one of the opponent's moves
+        for slot in range(size - 1, -1, -1):
+            cand = mon(b, side, slot)
+            ok = (slot != current) & (hp[cand] > 0) & tables.resist[sets[cand], sets[opp]]
+            chosen[ok] = slot
+        go = ~stay & (chosen >= 0)
+        active[b[go], side] = chosen[go]
+
+    def choose(att, dfn, turn):
+        score = tables.move_score[sets[att], sets[dfn]].copy()
+        effect = tables.move_effect[sets[att]]
+        att_hp = hp[att][:, None]
+        is_inf, is_conf = effect == INFATUATE, effect == CONFUSE
+        taken = np.where(is_inf, status['infatuated'][dfn][:, None], status['confused'][dfn][:, None])
+        desperate = att_hp < 30
+        score += np.where(is_inf | is_conf, np.where(taken, -5, np.where(desperate, 7, 2)), 0)
+        score += np.where(effect == HEAL, np.where(att_hp < 40, 3, -2), 0)
+        if turn <= 3:
+            score += np.where((effect == TOXIC) | (effect == PARALYZE), 2, np.where(effect == SLEEP, 3, 0))
+        score += np.where((effect == SUBSTITUTE) & (att_hp > 50), 2, 0)
+        slot = score.argmax(axis=1)
+        rows = np.arange(len(att))
+        moves = tables.moves[sets[att], slot]
+        return np.where(score[rows, slot] <= IMMUNE_SCORE // 2, NO_MOVE, moves)
+
+    def clear(mons, key):
+        status[key][mons] = 0 if key in COUNTER_STATUSES else False
+
+    #one attack for each battle in b, like one pass of play_turn's attack loop. returns the battles
+    #where the defender fainted, run_battle breaks out of the turn there
+    def attack(b, att, dfn, move):
+        #each step keeps only the battles whose attack carries on, like the scalar `continue`s
+        def keep(mask):
+            nonlocal b, att, dfn, move
+            b, att, dfn, move = b[mask], att[mask], dfn[mask], move[mask]
+
+        keep(hp[dfn] > 0)
+        volatile = status['infatuated'][att] | status['confused'][att]
+        snap = volatile & (rng.random(len(b)) < 0.3)
+        for key in ('infatuated', 'confused', 'turns_volatile'):
+            clear(att[snap], key)
+        lost = volatile & ~snap & (rng.random(len(b)) < 0.5)
+        status['turns_volatile'][att[lost]] += 1
+        keep(~lost)
+        keep(~(status['paralyzed'][att] & (rng.random(len(b)) <= 0.25)))
+        for key in ('asleep', 'frozen'):
+            out = status[key][att] > 0
+            status[key][att[out]] -= 1
+            keep(~out)
+
+        #sitrus
+        holder = sets[att]
+        use = ~item_used[att] & (hp[att] <= tables.low_hp_threshold[holder])
+        healed = att[use]
+        hp[healed] = np.minimum(100, hp[healed] + tables.low_hp_heal[holder[use]])
+        item_used[healed] = True
+
+        keep(rng.integers(1, 101, len(b)) <= MOVES.accuracy[move])
+
+        effect = MOVES.effect_code[move]
+        for code, (keys, _) in EFFECT_SPEECH.items():
+            hit = dfn[effect == code]
+            if isinstance(keys, tuple):
+                status[keys[0]][hit] = True
+                status[keys[1]][hit] = 1
+            else:
+                status[keys][hit] = True
+
+        #cure items, they go off on any move that gets this far
+        cure = tables.cure[sets[dfn]]
+        ready = (cure != NO_CURE) & ~item_used[dfn]
+        cured = dfn[ready & (cure == CURE_ALL)]
+        for key in STATUS_KEYS:
+            clear(cured, key)
+        item_used[cured] = True
+        for i, key in enumerate(STATUS_KEYS):
+            cured = dfn[ready & (cure == i) & (status[key][dfn] != 0)]
+            clear(cured, key)
+            item_used[cured] = True
+
+        keep((MOVES.category[move] != STATUS) & (MOVES.power[move] != 0))
+        move_type = MOVES.type_id[move].astype(np.int64)
+        dfn_sets = sets[dfn]
+        eff = tables.defense[dfn_sets, move_type]
+        keep(~((tables.ability_kind[dfn_sets] == IMMUNITY) & (tables.ability_type[dfn_sets] == move_type)) & (eff != 0.0))
+
+        move_type, power = MOVES.type_id[move].astype(np.int64), MOVES.power[move].astype(np.int64)
+        att_sets, dfn_sets = sets[att], sets[dfn]
+        eff = tables.defense[dfn_sets, move_type]
+        #atk always comes from modify_attack, whatever the category
+        atk = stats[att, ATK].astype(np.float64)
+        guts = (tables.ability_kind[att_sets] == ATTACK_IF_STATUS) & (
+            status['burned'][att] | status['poisoned'][att] | status['paralyzed'][att]
+            | (status['asleep'][att] > 0) | status['confused'][att])
+        atk[guts] *= 1.5
+        defense = np.where(MOVES.category[move] == SPECIAL, stats[dfn, SPD], stats[dfn, DEF])
+
+        boosted = tables.boost_type[att_sets] == move_type
+        power = np.where(boosted, np.floor(np.maximum(1, power) * tables.boost_multiplier[att_sets]).astype(np.int64), power)
+        power = np.where(rng.uniform(0, 100, len(b)) < tables.crit_chance[att_sets], power * 2, power)
+        low_hp = ((tables.ability_kind[att_sets] == LOW_HP_TYPE_BOOST) & (tables.ability_type[att_sets] == move_type)
+                  & (hp[att] / 100 < 0.333))
+        power = np.where(low_hp, np.floor(power * 1.5).astype(np.int64), power)
+        modifier = eff * (rng.integers(85, 101, len(b)) / 100)
+        damage = np.floor(((LEVEL_FACTOR * power * atk / defense) / 50 + 2) * modifier).astype(np.int64)
+
+        absorbed = (tables.ability_kind[dfn_sets] == HEAL_ON_HIT) & (tables.ability_type[dfn_sets] == move_type)
+        hp[dfn[absorbed]] = np.minimum(100, hp[dfn[absorbed]] + 25)
+        keep(~absorbed)
+        damage, att_sets, dfn_sets = damage[~absorbed], sets[att], sets[dfn]
+        hp[dfn] = np.maximum(0, hp[dfn] - damage)
+
+        #secondary status, only rolled for the ones run_battle tracks
+        field = SECONDARY_FIELD[MOVES.status_code[move]]
+        rolled = field >= 0
+        landed = np.zeros(len(b), dtype=bool)
+        landed[rolled] = rng.integers(1, 101, rolled.sum()) <= MOVES.status_chance[move][rolled]
+        for i, key in enumerate(STATUS_KEYS):
+            hit = dfn[landed & (field == i)]
+            hit = hit[status[key][hit] == 0]
+            status[key][hit] = 1 if key in COUNTER_STATUSES else True
+
+        kind = tables.ability_kind[dfn_sets]
+        contact = rng.random(len(b)) <= 0.3
+        for code, key in CONTACT_FIELDS:
+            status[key][att[(kind == code) & contact]] = True
+
+        #shell bell
+        fraction = tables.shell_fraction[att_sets]
+        bell = (fraction > 0) & (damage > 0)
+        gained = att[bell]
+        hp[gained] = np.minimum(100, hp[gained] + np.maximum(1, np.floor(damage[bell] * fraction[bell]).astype(np.int64)))
+
+        #burn then poison on the attacker, after its hit
+        burned = att[status['burned'][att]]
+        hp[burned] -= np.maximum(1, hp[burned] // 8)
+        poisoned = att[status['poisoned'][att]]
+        counter = status['toxic_counter'][poisoned]
+        toxic = counter > 0
+        hp[poisoned] -= np.maximum(1, np.where(toxic, hp[poisoned] * counter // 16, hp[poisoned] // 8))
+        status['toxic_counter'][poisoned[toxic]] += 1
+
+        #faint, next one up on that side goes in
+        fainted = hp[dfn] == 0
+        fb, side = b[fainted], (dfn[fainted] // size) % 2
+        replacement = np.full(len(fb), -1)
+        for slot in range(size - 1, -1, -1):
+            replacement[hp[mon(fb, side, slot)] > 0] = slot
+        up = replacement >= 0
+        active[fb[up], side[up]] = replacement[up]
+        return fb
+
+    winners = np.full(n, -1, dtype=np.int8)
+    turns = np.zeros(n, dtype=np.int64)
+    live = battles
+    for turn in range(1, max_turns + 1):
+        over = (hp[active_mon(live, 0)] <= 0) | (hp[active_mon(live, 1)] <= 0)
+        turns[live[over]] = turn
+        live = live[~over]
+        if not len(live):
+            break
+        switch(live, 0)
+        switch(live, 1)
+
+        player, enemy = active_mon(live, 0), active_mon(live, 1)
+        #speed ties go to the enemy
+        player_first = stats[player, SPE] > stats[enemy, SPE]
+        first, second = np.where(player_first, player, enemy), np.where(player_first, enemy, player)
+        first_move, second_move = choose(first, second, turn), choose(second, first, turn)
+
+        broke = attack(live, first, second, first_move)
+        rest = np.ones(n, dtype=bool)
+        rest[broke] = False
+        rest = rest[live]
+        attack(live[rest], second[rest], first[rest], second_move[rest])
+
+        #leftovers on whoever is out now
+        for side in (0, 1):
+            m = active_mon(live, side)
+            percent = tables.end_turn_percent[sets[m]]
+            m, percent = m[(percent > 0) & (hp[m] > 0)], percent[(percent > 0) & (hp[m] > 0)]
+            hp[m] = np.minimum(100, hp[m] + np.maximum(1, np.floor(hp[m] * (percent / 100)).astype(np.int64)))
+    else:
+        #made it through the last turn, run_battle calls that a draw
+        turns[live] = max_turns + 1
+        winners[live] = DRAW
+        live = live[:0]
+
+    #everyone else ended on their own, whoever still has a mon standing wins (player checked first)
+    ended = winners < 0
+    alive = (hp.reshape(n, 2, size) > 0).any(axis=2)
+    winners[ended] = np.where(alive[ended, 0], PLAYER_WIN, np.where(alive[ended, 1], ENEMY_WIN, DRAW))
+    return BatchResult(winners, turns)
+
+class Equivalence(NamedTuple):
+    scalar: tuple           #(player, enemy, draw) counts from run_battle
+    batch: tuple            #same from run_batch
+    outcome_p: float        #chi-square test that both come from the same outcome distribution
+    scalar_turns: float     #mean battle length
+    batch_turns: float
+    turns_p: float          #two-sided z test on the mean length
+
+#plays the same n matchups through run_battle and run_batch and tests whether the two engines agree
+#on who wins and how long battles go. small p values (say under 0.001) mean they don't
+def check_equivalence(n_games=20_000, seed=0, roster_path="L50R1P.csv"):
+    from events import BattleEndEvent
+    from sampler import load_sampler
+    from script import SILENT, run_battle
+    from tournament import game_rng
+
+    sampler = load_sampler((roster_path,))
+    rng = np.random.default_rng(seed)
+    player = sampler.draw(n_games, 3, rng)
+    enemy = sampler.draw(n_games, 3, rng, exclude_species=sampler.species_ids[0][player])
+    teams = np.stack([player, enemy], axis=1)
+
+    codes = {"player": PLAYER_WIN, "enemy": ENEMY_WIN, "draw": DRAW}
+    scalar_winners = np.empty(n_games, dtype=np.int8)
+    scalar_turns = np.empty(n_games, dtype=np.int64)
+    for i in range(n_games):
+        def sink(event):
+            if isinstance(event, BattleEndEvent):
+                scalar_turns[i] = event.turn
+        winner = run_battle(sampler.team(player[i]), sampler.team(enemy[i]), verbosity=SILENT, events=sink,
+                            rng=game_rng(seed, i))
+        scalar_winners[i] = codes[winner]
+    batch = run_batch(BatchTables(sampler.rosters[0]), teams, rng)
+
+    table = np.array([np.bincount(scalar_winners, minlength=3), np.bincount(batch.winners, minlength=3)], dtype=float)
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / table.sum()
+    used = expected.sum(axis=0) > 0
+    chi2 = ((table - expected)[:, used] ** 2 / expected[:, used]).sum()
+    #survival function of chi-square, closed form for 2 degrees of freedom (1 if a column is empty)
+    dof = used.sum() - 1
+    outcome_p = math.exp(-chi2 / 2) if dof == 2 else math.erfc(math.sqrt(chi2 / 2)) if dof == 1 else 1.0
+
+    a, b = scalar_turns.astype(float), batch.turns.astype(float)
+    z = (a.mean() - b.mean()) / math.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+    turns_p = math.erfc(abs(z) / math.sqrt(2))
+    return Equivalence(tuple(int(c) for c in table[0]), tuple(int(c) for c in table[1]), outcome_p,
+                       a.mean(), b.mean(), turns_p)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check run_batch against run_battle on the same matchups.")
+    parser.add_argument("--games", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = check_equivalence(args.games, args.seed)
+    print(f"run_battle: {result.scalar}, {result.scalar_turns:.2f} turns on average")
+    print(f" run_batch: {result.batch}, {result.batch_turns:.2f} turns on average")
+    print(f"outcomes p = {result.outcome_p:.3f}, battle length p = {result.turns_p:.3f}")
@@ -0,0 +1,43 @@
+from pokemon import BattleMon
+
+PLAYER, ENEMY = 0, 1
+
+#all of one battle's state: both parties indexed [side][slot], which slot is out on each side, weather and turn.
+#nothing is keyed by name so mirror matches are fine, and clone() is cheap enough for search
+class BattleState:
+    __slots__ = ('teams', 'active', 'weather', 'weather_turns', 'turn')
+
+    def __init__(self, player_team, enemy_team):
+        self.teams = (
+            [BattleMon(mon, PLAYER, slot) for slot, mon in enumerate(player_team)],
+            [BattleMon(mon, ENEMY, slot) for slot, mon in enumerate(enemy_team)],
+        )
+        self.active = [0, 0]
+        self.weather = None
+        self.weather_turns = 0
+        self.turn = 1
+
+    def active_mon(self, side):
+        return self.teams[side][self.active[side]]
+
+    def send_out(self, mon):
+        self.active[mon.side] = mon.slot
+
+    #first slot on that side that can still fight, None if they're all down
+    def next_available(self, side):
+        for mon in self.teams[side]:
+            if mon.hp > 0:
+                return mon
+        return None
+
+    def alive(self, side):
+        return any(mon.hp > 0 for mon in self.teams[side])
+
+    def clone(self):
+        new = BattleState.__new__(BattleState)
+        new.teams = ([mon.clone() for mon in self.teams[0]], [mon.clone() for mon in self.teams[1]])
+        new.active = list(self.active)
+        new.weather = self.weather
+        new.weather_turns = self.weather_turns
+        new.turn = self.turn
+        return new
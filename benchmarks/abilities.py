@@ -0,0 +1,102 @@
+#ability work done for one attack: the old effect-string lookups vs the compiled AbilityEffect records
+#run from the repo root: python -m benchmarks.abilities [--n N]
+import argparse
+import random
+import timeit
+
+from abilities import abilities as ability_lookup
+from ability_effects import (apply_contact_ability, boost_type_if_lowhp, check_immunity,
+                             modify_attack, modify_speed, should_heal_on_hit)
+from pokemon import BattleMon, PokemonSet
+from script import load_pokemon_list
+from type_chart import TYPES
+
+#the string versions run_battle used to call
+def legacy_check_immunity(ability_effect, move_type):
+    if ability_effect.startswith("immunity:"):
+        return move_type == ability_effect.split(":")[1]
+    return False
+
+def legacy_modify_speed(mon, weather, ability_effect):
+    if ability_effect == "boost_spe_if_sun" and weather == "Sun":
+        return mon.stats["spe"] * 2
+    if ability_effect == "boost_spe_if_rain" and weather == "Rain":
+        return mon.stats["spe"] * 2
+    return mon.stats["spe"]
+
+def legacy_modify_attack(mon, ability_effect):
+    if ability_effect == "boost_atk_if_status":
+        if any([mon.burned, mon.poisoned, mon.paralyzed, mon.asleep > 0, mon.confused]):
+            return mon.stats["atk"] * 1.5
+    return mon.stats["atk"]
+
+def legacy_boost_type_if_lowhp(mon, move_type, ability_effect, hp_ratio):
+    if ability_effect.startswith("boost_type_if_lowhp:"):
+        if move_type == ability_effect.split(":")[1] and hp_ratio < 0.333:
+            return 1.5
+    return 1.0
+
+def legacy_should_heal_on_hit(ability_effect, move_type):
+    if ability_effect.startswith("heal_on_hit:"):
+        return move_type == ability_effect.split(":")[1]
+    return False
+
+def legacy_apply_contact_ability(defender, attacker, ability_effect):
+    if ability_effect == "contact_paralyze":
+        if random.random() <= 0.3:
+            attacker.paralyzed = True
+            return "paralyzed"
+    if ability_effect == "contact_burn":
+        if random.random() <= 0.3:
+            attacker.burned = True
+            return "burned"
+    if ability_effect == "chanceinfatuate":
+        if random.random() <= 0.3:
+            attacker.infatuated = True
+            return "infatuated"
+    return None
+
+def legacy_attack(attacker, defender, move_type_id):
+    move_type = TYPES[move_type_id]
+    legacy_modify_speed(attacker, None, ability_lookup.get(attacker.ability, {}).get("effect", ""))
+    legacy_modify_attack(attacker, ability_lookup.get(attacker.ability, {}).get("effect", ""))
+    legacy_check_immunity(ability_lookup.get(defender.ability, {}).get('effect', ''), move_type)
+    legacy_boost_type_if_lowhp(attacker, move_type, ability_lookup.get(attacker.ability, {}).get("effect", ""), attacker.hp / 100)
+    legacy_should_heal_on_hit(ability_lookup.get(defender.ability, {}).get("effect", ""), move_type)
+    legacy_apply_contact_ability(defender, attacker, ability_lookup.get(defender.ability, {}).get("effect", ""))
+
+def compiled_attack(attacker, defender, move_type_id):
+    modify_speed(attacker, None, attacker.ability_effect)
+    modify_attack(attacker, attacker.ability_effect)
+    check_immunity(defender.ability_effect, move_type_id)
+    boost_type_if_lowhp(attacker, move_type_id, attacker.ability_effect, attacker.hp / 100)
+    should_heal_on_hit(defender.ability_effect, move_type_id)
+    apply_contact_ability(defender, attacker, defender.ability_effect)
+
+def _run(fn, attacks):
+    for attacker, defender, move_type_id in attacks:
+        fn(attacker, defender, move_type_id)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    #the csv has no abilities, so hand every set a random one
+    rng = random.Random(args.seed)
+    names = sorted(ability_lookup)
+    roster = [BattleMon(PokemonSet(m.name, m.types, m.move_names, dict(m.stats), m.item, rng.choice(names)))
+              for m in load_pokemon_list()]
+    attacks = []
+    for _ in range(args.n):
+        attacker, defender = rng.sample(roster, 2)
+        attacks.append((attacker, defender, rng.choice(attacker.move_type_ids)))
+
+    legacy = min(timeit.repeat(lambda: _run(legacy_attack, attacks), number=1, repeat=5))
+    compiled = min(timeit.repeat(lambda: _run(compiled_attack, attacks), number=1, repeat=5))
+    print(f"effect strings:   {legacy / args.n * 1e9:7.1f} ns per attack")
+    print(f"compiled records: {compiled / args.n * 1e9:7.1f} ns per attack")
+
+if __name__ == "__main__":
+    main()
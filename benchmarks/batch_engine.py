@@ -0,0 +1,46 @@
+#battles per second for run_battle one game at a time against run_batch at a few batch sizes
+#run from the repo root: python -m benchmarks.batch_engine [--games N] [--sizes 1000 10000 ...]
+import argparse
+import random
+import time
+
+import numpy as np
+
+from batch_engine import BatchTables, run_batch
+from sampler import load_sampler
+from script import SILENT, run_battle
+
+def _teams(sampler, n, rng):
+    player = sampler.draw(n, 3, rng)
+    enemy = sampler.draw(n, 3, rng, exclude_species=sampler.species_ids[0][player])
+    return np.stack([player, enemy], axis=1)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=1000, help="games for the run_battle baseline")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100, 1000, 10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sampler = load_sampler()
+    rng = np.random.default_rng(args.seed)
+
+    teams = _teams(sampler, args.games, rng)
+    start = time.perf_counter()
+    for i, (player, enemy) in enumerate(teams):
+        run_battle(sampler.team(player), sampler.team(enemy), verbosity=SILENT, rng=random.Random(i))
+    scalar = args.games / (time.perf_counter() - start)
+    print(f"{'run_battle':>18}: {scalar:10.0f} battles/s")
+
+    start = time.perf_counter()
+    tables = BatchTables(sampler.rosters[0])
+    print(f"{'BatchTables':>18}: {time.perf_counter() - start:10.2f} s to build")
+    for size in args.sizes:
+        teams = _teams(sampler, size, rng)
+        start = time.perf_counter()
+        run_batch(tables, teams, rng)
+        rate = size / (time.perf_counter() - start)
+        print(f"{f'run_batch({size})':>18}: {rate:10.0f} battles/s, {rate / scalar:5.1f}x")
+
+if __name__ == "__main__":
+    main()
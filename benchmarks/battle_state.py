@@ -0,0 +1,69 @@
+#per-turn cost of run_battle, and what it costs to copy a battle's state for search
+#run from the repo root: python -m benchmarks.battle_state [--games N]
+import argparse
+import copy
+import random
+import timeit
+
+from events import BattleEndEvent
+from script import SILENT, load_pokemon_list, run_battle
+
+def _count_turns(matchups):
+    turns = 0
+    def sink(event):
+        nonlocal turns
+        if isinstance(event, BattleEndEvent):
+            turns += event.turn - 1
+    for i, (player_team, enemy_team) in enumerate(matchups):
+        random.seed(i)
+        run_battle(player_team, enemy_team, verbosity=SILENT, events=sink)
+    return turns
+
+def _play(matchups):
+    for i, (player_team, enemy_team) in enumerate(matchups):
+        random.seed(i)
+        run_battle(player_team, enemy_team, verbosity=SILENT)
+
+#what run_battle used to carry around: name keyed dicts for everything
+def _legacy_state(mons):
+    return {
+        'hp': {mon.name: 100 for mon in mons},
+        'status_effects': {mon.name: {'infatuated': False, 'confused': False, 'turns_volatile': 0,
+                                      'paralyzed': False, 'asleep': 0, 'frozen': 0, 'burned': False,
+                                      'poisoned': False, 'toxic_counter': 0} for mon in mons},
+        'item_used': {mon.name: False for mon in mons},
+        'active_turns': {mon.name: 0 for mon in mons},
+        'weather': {'type': None, 'turns': 0},
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    roster = load_pokemon_list()
+    rng = random.Random(args.seed)
+    matchups = [(rng.sample(roster, 3), rng.sample(roster, 3)) for _ in range(args.games)]
+
+    turns = _count_turns(matchups)
+    best = min(timeit.repeat(lambda: _play(matchups), number=1, repeat=3))
+    print(f"run_battle: {turns} turns over {args.games} battles, {best / turns * 1e6:.2f} us per turn")
+
+    player_team, enemy_team = matchups[0]
+    n = 20_000
+    try:
+        from battle_state import BattleState
+    except ImportError:
+        pass
+    else:
+        state = BattleState(player_team, enemy_team)
+        clone = min(timeit.repeat(state.clone, number=n, repeat=3)) / n
+        print(f"BattleState.clone(): {clone * 1e6:.2f} us")
+
+    legacy = _legacy_state(player_team + enemy_team)
+    deep = min(timeit.repeat(lambda: copy.deepcopy(legacy), number=n // 10, repeat=3)) / (n // 10)
+    print(f"deepcopy of name-keyed dicts: {deep * 1e6:.2f} us")
+
+if __name__ == "__main__":
+    main()
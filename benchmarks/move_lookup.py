@@ -0,0 +1,52 @@
+#per-action move lookups: old move_types dict path vs the compiled MoveTable
+#run from the repo root: python -m benchmarks.move_lookup [--n N]
+import argparse
+import random
+import timeit
+
+from move_types_full import move_types
+from move_table import MOVES, MOVE_ROWS
+
+def dict_path(names):
+    for move in names:
+        move_data = move_types.get(move, {})
+        move_data.get('type', '')
+        move_data.get('power', 0)
+        move_data.get('accuracy', 100)
+        move_data.get('category')
+        move_data.get('effect')
+        move_data.get('status')
+        move_data.get('status_chance', 0)
+
+def array_path(ids):
+    type_id, power, accuracy = MOVES.type_id, MOVES.power, MOVES.accuracy
+    category, effect_code = MOVES.category, MOVES.effect_code
+    status_code, status_chance = MOVES.status_code, MOVES.status_chance
+    for move in ids:
+        type_id[move]
+        power[move]
+        accuracy[move]
+        category[move]
+        effect_code[move]
+        status_code[move]
+        status_chance[move]
+
+def row_path(ids):
+    for move in ids:
+        move_type_id, power, accuracy, category, effect, status_code, chance = MOVE_ROWS[move]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = [rng.choice(MOVES.names[1:]) for _ in range(args.n)]
+    ids = [MOVES.ids[name] for name in names]
+
+    for label, fn, arg in [("dict", dict_path, names), ("numpy arrays", array_path, ids), ("MoveTable rows", row_path, ids)]:
+        best = min(timeit.repeat(lambda: fn(arg), number=1, repeat=5))
+        print(f"{label:>15}: {best / args.n * 1e9:7.1f} ns per move lookup")
+
+if __name__ == "__main__":
+    main()
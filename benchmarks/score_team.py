@@ -0,0 +1,83 @@
+#score_team: the old set-based version vs per-mon bitmasks, with mon_features cached and cold
+#run from the repo root: python -m benchmarks.score_team [--samples N]
+import argparse
+import random
+import timeit
+from itertools import combinations
+
+from move_table import MOVE_ROWS, NO_MOVE
+from script import ALL_DEFENDING_TYPES, load_pokemon_list, mon_features, score_move, score_team
+from type_chart import TYPE_EFF, type_id
+
+DEFENDING_IDS = [type_id(t) for t in ALL_DEFENDING_TYPES]
+
+#score_team before the per-mon features, rebuilds every set for every team
+#(stats back then were base stats, which is what base_stats holds now)
+def legacy_score_team(team):
+    total_score = 0
+    for mon in team:
+        if sum(mon.base_stats.values()) >= 500:
+            total_score += 1
+        if mon.base_stats['spe'] > 90:
+            total_score += 1
+
+    if len(set(t for mon in team for t in mon.types)) >= 5:
+        total_score += 1
+    if len(set(move for mon in team for move in mon.moves)) >= 8:
+        total_score += 1
+
+    status_bonus = sum(score_move(mon, move, 1, 1.0) for mon in team for move in mon.moves)
+    total_score += min(status_bonus // 3, 2)
+
+    coverage = set()
+    for mon in team:
+        for move in mon.moves:
+            if move == NO_MOVE:
+                continue
+            eff_row = TYPE_EFF[MOVE_ROWS[move][0]]
+            for defending_type in DEFENDING_IDS:
+                if eff_row[defending_type] == 2.0:
+                    coverage.add(defending_type)
+    if len(coverage) >= 10:
+        total_score += 2
+    elif len(coverage) >= 6:
+        total_score += 1
+    return total_score
+
+def _score_all(fn, teams):
+    for team in teams:
+        fn(team)
+
+def _cold(teams):
+    mon_features.cache_clear()
+    _score_all(score_team, teams)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    roster = load_pokemon_list()
+    rng = random.Random(args.seed)
+    #a factory round's 6 rentals
+    rental = rng.sample(roster, 6)
+    workloads = [
+        ("rental pool, all 20 teams", list(combinations(rental, 3))),
+        (f"full roster, {args.samples} random teams", [rng.sample(roster, 3) for _ in range(args.samples)]),
+    ]
+
+    for label, teams in workloads:
+        assert [legacy_score_team(t) for t in teams] == [score_team(t) for t in teams]
+        number = max(1, 20_000 // len(teams))
+        legacy = min(timeit.repeat(lambda: _score_all(legacy_score_team, teams), number=number, repeat=5))
+        warm = min(timeit.repeat(lambda: _score_all(score_team, teams), number=number, repeat=5))
+        cold = min(timeit.repeat(lambda: _cold(teams), number=number, repeat=5))
+        per = len(teams) * number / 1e6
+        print(f"{label}:")
+        print(f"  legacy sets:          {legacy / per:8.2f} us per team")
+        print(f"  bitmasks, warm cache: {warm / per:8.2f} us per team")
+        print(f"  bitmasks, cold cache: {cold / per:8.2f} us per team")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#fixed-seed benchmarks for the engine hot paths, saved as json so two runs can be compared
+#run from the repo root:
+#  python -m benchmarks.suite run [--out results.json] [--repeats N]
+#  python -m benchmarks.suite compare old.json new.json [--threshold 0.1]
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from batch_engine import BatchTables, run_batch
+from damage import damage_distribution
+from pokemon import BattleMon
+from sampler import load_sampler
+from script import SILENT, cached_best_move, choose_best_move, choose_top_team, mon_features, run_battle, score_team, should_switch
+
+#each case builds its fixed inputs from the seed, then returns a function that does `ops` units of work
+def _battles(sampler, seed, team_size, n):
+    rng = np.random.default_rng(seed)
+    players = sampler.draw(n, team_size, rng)
+    enemies = sampler.draw(n, team_size, rng, exclude_species=sampler.species_ids[0][players])
+    matchups = [(sampler.team(p), sampler.team(e)) for p, e in zip(players, enemies)]
+    def work():
+        for i, (player_team, enemy_team) in enumerate(matchups):
+            run_battle(player_team, enemy_team, verbosity=SILENT, rng=random.Random(i))
+    return work, n
+
+def _batch_battles(sampler, seed, n):
+    rng = np.random.default_rng(seed)
+    players = sampler.draw(n, 3, rng)
+    enemies = sampler.draw(n, 3, rng, exclude_species=sampler.species_ids[0][players])
+    teams = np.stack([players, enemies], axis=1)
+    tables = BatchTables(sampler.rosters[0])
+    def work():
+        run_batch(tables, teams, np.random.default_rng(seed))
+    return work, n
+
+def _mon_pairs(sampler, seed, n):
+    rng = np.random.default_rng(seed)
+    pairs = sampler.draw(n, 2, rng)
+    return [(BattleMon(sampler.rosters[0][a]), BattleMon(sampler.rosters[0][b])) for a, b in pairs]
+
+def _choose_best_move(sampler, seed, n):
+    pairs = _mon_pairs(sampler, seed, n)
+    def work():
+        for turn, (attacker, defender) in enumerate(pairs, 1):
+            choose_best_move(attacker, defender, turn % 10 + 1, 1.0, verbose=False)
+    return work, n
+
+#same calls, answered from the cache after the warm up run
+def _cached_best_move(sampler, seed, n):
+    pairs = _mon_pairs(sampler, seed, n)
+    def work():
+        for turn, (attacker, defender) in enumerate(pairs, 1):
+            cached_best_move(attacker, defender, turn % 10 + 1, 1.0)
+    return work, n
+
+def _damage_distribution(sampler, seed, n):
+    pairs = _mon_pairs(sampler, seed, n)
+    def work():
+        for attacker, defender in pairs:
+            for move in attacker.moves:
+                damage_distribution(attacker, defender, move).expected(defender.hp)
+    return work, n
+
+def _should_switch(sampler, seed, n):
+    rng = np.random.default_rng(seed)
+    teams = sampler.draw(n, 4, rng)
+    cases = []
+    for row in teams:
+        mons = [BattleMon(sampler.rosters[0][i]) for i in row]
+        mons[0].hp = int(rng.integers(1, 101))
+        cases.append((mons[0], mons[:3], mons[3]))
+    def work():
+        for current, team, opponent in cases:
+            should_switch(current, team, opponent)
+    return work, n
+
+def _score_team(sampler, seed, n):
+    rng = np.random.default_rng(seed)
+    teams = [sampler.team(row) for row in sampler.draw(n, 3, rng)]
+    def work():
+        #cold every time, so this is what a fresh roster costs
+        mon_features.cache_clear()
+        for team in teams:
+            score_team(team)
+    return work, n
+
+def _choose_top_team(sampler, seed, n):
+    rng = np.random.default_rng(seed)
+    pools = [sampler.team(row) for row in sampler.draw(n, 6, rng)]
+    def work():
+        mon_features.cache_clear()
+        for pool in pools:
+            choose_top_team(pool)
+    return work, n
+
+def _choose_top_team_full(sampler, seed, n):
+    roster = list(sampler.rosters[0])
+    def work():
+        mon_features.cache_clear()
+        choose_top_team(roster)
+    return work, 1
+
+#name -> (builder, unit). rates are ops per second, latencies are ms per op
+CASES = {
+    "battles_1v1": (lambda s, seed: _battles(s, seed, 1, 600), "battles/s"),
+    "battles_3v3": (lambda s, seed: _battles(s, seed, 3, 200), "battles/s"),
+    "batch_battles_3v3": (lambda s, seed: _batch_battles(s, seed, 10_000), "battles/s"),
+    "choose_best_move": (lambda s, seed: _choose_best_move(s, seed, 20_000), "calls/s"),
+    "cached_best_move": (lambda s, seed: _cached_best_move(s, seed, 20_000), "calls/s"),
+    "should_switch": (lambda s, seed: _should_switch(s, seed, 20_000), "calls/s"),
+    "damage_distribution": (lambda s, seed: _damage_distribution(s, seed, 20_000), "pairs/s"),
+    "score_team": (lambda s, seed: _score_team(s, seed, 20_000), "calls/s"),
+    "choose_top_team_6": (lambda s, seed: _choose_top_team(s, seed, 500), "ms/pool"),
+    "choose_top_team_510": (lambda s, seed: _choose_top_team_full(s, seed, 1), "ms/pool"),
+}
+
+def higher_is_better(unit):
+    return unit.endswith("/s")
+
+def run_suite(names=None, seed=0, repeats=5, roster_path="L50R1P.csv"):
+    sampler = load_sampler((roster_path,))
+    results = {}
+    for name, (build, unit) in CASES.items():
+        if names and name not in names:
+            continue
+        work, ops = build(sampler, seed)
+        work()  #warm up
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            work()
+            best = min(best, time.perf_counter() - start)
+        value = ops / best if higher_is_better(unit) else best / ops * 1e3
+        results[name] = {"value": value, "unit": unit}
+        print(f"{name:>20}: {value:14.3f} {unit}")
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+#flags every case that got worse by more than threshold (0.1 = 10%), returns the flagged names
+def compare(old, new, threshold=0.1):
+    regressions = []
+    for name, result in new["results"].items():
+        if name not in old["results"]:
+            print(f"{name:>20}: new")
+            continue
+        before, after = old["results"][name]["value"], result["value"]
+        change = (after - before) / before
+        worse = -change if higher_is_better(result["unit"]) else change
+        flag = "REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:>20}: {before:14.3f} -> {after:14.3f} {result['unit']:<10} {change:+7.1%} {flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine benchmark suite.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run")
+    run_parser.add_argument("--out", default=None, help="write results here as json")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--only", nargs="*", choices=list(CASES), default=None)
+    compare_parser = sub.add_parser("compare")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_suite(args.only, args.seed, args.repeats)
+        if args.out:
+            report = {
+                "meta": {"commit": _git_commit(), "python": platform.python_version(), "machine": platform.platform(),
+                         "seed": args.seed, "repeats": args.repeats, "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                "results": results,
+            }
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2)
+    else:
+        with open(args.old) as f:
+            old = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#battles per second for each run_battle verbosity mode
+#run from the repo root: python -m benchmarks.verbosity [--games N]
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from script import SILENT, SUMMARY, FULL, load_pokemon_list, run_battle
+
+def _time_mode(matchups, verbosity, sink=None, repeats=3):
+    best = float("inf")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for i, (player_team, enemy_team) in enumerate(matchups):
+                random.seed(i)
+                run_battle(player_team, enemy_team, verbosity=verbosity, events=sink)
+            best = min(best, time.perf_counter() - start)
+    return len(matchups) / best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    roster = load_pokemon_list()
+    rng = random.Random(args.seed)
+    matchups = [(rng.sample(roster, 3), rng.sample(roster, 3)) for _ in range(args.games)]
+
+    events = []
+    modes = [
+        ("silent", SILENT, None),
+        ("silent + events", SILENT, events.append),
+        ("summary", SUMMARY, None),
+        ("full", FULL, None),
+    ]
+    for label, verbosity, sink in modes:
+        print(f"{label:>16}: {_time_mode(matchups, verbosity, sink):8.1f} battles/s")
+    print(f"({len(events)} events collected)")
+
+if __name__ == "__main__":
+    main()
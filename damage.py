@@ -0,0 +1,141 @@
+from bisect import bisect_left
+from functools import lru_cache
+from typing import NamedTuple
+
+from ability_effects import check_immunity, modify_attack, boost_type_if_lowhp, should_heal_on_hit
+from move_table import MOVES, MOVE_ROWS, SPECIAL, STATUS
+from pokemon import BattleMon
+from type_chart import TYPE_IDS
+
+#the 16 damage rolls, run_battle draws one of these evenly. every roll tuple below has one damage per roll, in this order
+ROLLS = tuple(r / 100 for r in range(85, 101))
+BASE_CRIT_CHANCE = 6.25
+LEVEL_FACTOR = 2 * 50 / 5 + 2
+
+THUNDER = MOVES.ids['Thunder']
+WATER, FIRE = TYPE_IDS['Water'], TYPE_IDS['Fire']
+
+#gen 3 formula (heavily simplified), modifier is effectiveness times the roll
+def hit_damage(power, atk, defense, modifier):
+    return int(((LEVEL_FACTOR * power * atk / defense) / 50 + 2) * modifier)
+
+#every damage one move can do: the 16 rolls without and with a crit, how likely the crit is and
+#how likely the move is to hit at all. all chances are 0-1
+class DamageDistribution(NamedTuple):
+    normal: tuple
+    crit: tuple
+    crit_chance: float
+    accuracy: float
+
+    #mean damage, capped at hp if you pass it (damage past 0 hp doesn't count for anything).
+    #rolls only go up and crits are never weaker, so the cap only matters when the top crit roll is past hp
+    def expected(self, hp=None):
+        if hp is None or self.crit[-1] <= hp:
+            normal, crit = sum(self.normal), sum(self.crit)
+        else:
+            normal = sum([d if d < hp else hp for d in self.normal])
+            crit = sum([d if d < hp else hp for d in self.crit])
+        return self.accuracy * ((1 - self.crit_chance) * normal + self.crit_chance * crit) / 16
+
+    #chance this one hit takes a defender at hp down to 0
+    def ko_chance(self, hp):
+        if self.crit[-1] < hp:
+            return 0.0
+        normal = 16 - bisect_left(self.normal, hp)
+        crit = 16 - bisect_left(self.crit, hp)
+        return self.accuracy * ((1 - self.crit_chance) * normal + self.crit_chance * crit) / 16
+
+    #damage -> chance, misses count as 0 damage
+    def pmf(self):
+        out = {0: 1 - self.accuracy}
+        weight = self.accuracy / len(ROLLS)
+        for rolls, chance in ((self.normal, 1 - self.crit_chance), (self.crit, self.crit_chance)):
+            for d in rolls:
+                out[d] = out.get(d, 0) + weight * chance
+        return out
+
+NO_DAMAGE = DamageDistribution((0,) * len(ROLLS), (0,) * len(ROLLS), 0.0, 1.0)
+
+#the damage of each of the 16 rolls
+@lru_cache(maxsize=1 << 16)
+def rolls(power, atk, defense, eff):
+    return tuple(hit_damage(power, atk, defense, eff * roll) for roll in ROLLS)
+
+#the distribution only depends on these few numbers, so that's what gets cached.
+#lots of different mon pairs end up on the same key
+@lru_cache(maxsize=1 << 16)
+def _distribution(power, crit_power, atk, defense, eff, crit_chance, accuracy):
+    return DamageDistribution(rolls(power, atk, defense, eff), rolls(crit_power, atk, defense, eff),
+                              crit_chance / 100, accuracy / 100)
+
+#what move does from attacker to defender (BattleMons) right now, same steps as run_battle:
+#type boosting item, then weather, then crit, then the low hp ability boost
+def damage_distribution(attacker, defender, move, weather=None):
+    move_type_id, power, accuracy, category, effect, status_code, chance = MOVE_ROWS[move]
+    if category == STATUS or power == 0:
+        return NO_DAMAGE
+    eff = defender.defense[move_type_id]
+    defender_ability = defender.ability_effect
+    if eff == 0.0 or check_immunity(defender_ability, move_type_id) or should_heal_on_hit(defender_ability, move_type_id):
+        return NO_DAMAGE
+
+    if move == THUNDER and weather == 'Rain':
+        accuracy = 100
+    #atk always comes from modify_attack, whatever the category
+    atk = modify_attack(attacker, attacker.ability_effect)
+    defense = defender.stats['spd' if category == SPECIAL else 'def']
+
+    on_move = attacker.item_hooks.on_move
+    if on_move and on_move.boost_type_id == move_type_id:
+        power = int(max(1, power) * on_move.multiplier)
+    if weather == 'Rain':
+        if move_type_id == WATER:
+            power = int(power * 1.5)
+        elif move_type_id == FIRE:
+            power = int(power * 0.5)
+    elif weather == 'Sun':
+        if move_type_id == FIRE:
+            power = int(power * 1.5)
+        elif move_type_id == WATER:
+            power = int(power * 0.5)
+    crit_chance = on_move.crit_chance if on_move else BASE_CRIT_CHANCE
+    boost = boost_type_if_lowhp(attacker, move_type_id, attacker.ability_effect, attacker.hp / 100)
+    return _distribution(int(power * boost), int(int(power * 2) * boost), atk, defense, eff, crit_chance, accuracy)
+
+#same thing for two untouched sets (full hp, no status, no stat drops), keyed on the sets themselves
+@lru_cache(maxsize=1 << 16)
+def set_damage_distribution(attacker_set, defender_set, move, weather=None):
+    return damage_distribution(BattleMon(attacker_set), BattleMon(defender_set), move, weather)
+
+def expected_damage(attacker, defender, move, weather=None):
+    return damage_distribution(attacker, defender, move, weather).expected(defender.hp)
+
+def ko_chance(attacker, defender, move, weather=None):
+    return damage_distribution(attacker, defender, move, weather).ko_chance(defender.hp)
+
+def cache_info():
+    return _distribution.cache_info(), set_damage_distribution.cache_info()
+
+def cache_clear():
+    rolls.cache_clear()
+    _distribution.cache_clear()
+    set_damage_distribution.cache_clear()
+
+if __name__ == "__main__":
+    import argparse
+
+    from roster import load_roster
+
+    parser = argparse.ArgumentParser(description="Damage rolls from one set to another, both at full hp.")
+    parser.add_argument("attacker", type=int, help="row of the attacking set in the roster")
+    parser.add_argument("defender", type=int, help="row of the defending set")
+    parser.add_argument("--weather", choices=["Rain", "Sun"], default=None)
+    args = parser.parse_args()
+
+    roster = load_roster("L50R1P.csv")
+    attacker, defender = roster[args.attacker], roster[args.defender]
+    print(f"{attacker} -> {defender}")
+    for move, name in zip(attacker.moves, attacker.move_names):
+        dist = set_damage_distribution(attacker, defender, move, args.weather)
+        print(f"{name:>16}: {min(dist.normal):3}-{max(dist.normal):3} (crit {min(dist.crit)}-{max(dist.crit)}), "
+              f"expected {dist.expected(100):5.1f}, ko from full {dist.ko_chance(100):.1%}")
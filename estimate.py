@@ -0,0 +1,83 @@
+import math
+from typing import NamedTuple
+
+from script import SILENT, run_battle
+from tournament import game_rng
+
+#z for a 95% interval on the estimate, and a stricter 99% one for calling a side
+#clearly ahead since that check gets looked at after every batch
+Z_INTERVAL = 1.96
+Z_DECISIVE = 2.576
+
+class WinRateEstimate(NamedTuple):
+    estimate: float         #team_a's score per game, a draw counts as half
+    interval: tuple         #(low, high) wilson interval on the estimate
+    games: int
+    wins: int
+    draws: int
+    losses: int
+
+#wilson score interval, fine with fractional successes so draws can count as half a win
+def wilson_interval(successes, n, z=Z_INTERVAL):
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+#plays team_a (as player) against team_b in batches until the interval is narrower than
+#target_ci, or team_a is clearly winning/losing, or max_games run out.
+#game i gets the same rng run_tournament would give it, so a given seed always gives the same answer
+def estimate_win_rate(team_a, team_b, target_ci=0.1, max_games=500, min_games=20, batch=10, seed=0):
+    wins = draws = games = 0
+    while games < max_games:
+        for i in range(games, min(games + batch, max_games)):
+            winner = run_battle(team_a, team_b, verbosity=SILENT, rng=game_rng(seed, i))
+            if winner == "player":
+                wins += 1
+            elif winner == "draw":
+                draws += 1
+            games += 1
+        if games < min_games:
+            continue
+
+        score = wins + draws / 2
+        low, high = wilson_interval(score, games)
+        if high - low <= target_ci:
+            break
+        decisive_low, decisive_high = wilson_interval(score, games, Z_DECISIVE)
+        if decisive_low > 0.5 or decisive_high < 0.5:
+            break
+
+    score = wins + draws / 2
+    return WinRateEstimate(score / games if games else 0.5, wilson_interval(score, games), games,
+                           wins, draws, games - wins - draws)
+
+if __name__ == "__main__":
+    import argparse
+    import random
+
+    from script import choose_top_team, load_pokemon_list
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matchups", type=int, default=10)
+    parser.add_argument("--target-ci", type=float, default=0.1)
+    parser.add_argument("--max-games", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    roster = load_pokemon_list()
+    rng = random.Random(args.seed)
+    total = 0
+    #best scoring team out of a 6 mon rental pool against a random 3
+    for m in range(args.matchups):
+        team_a = choose_top_team(rng.sample(roster, 6))
+        team_b = rng.sample(roster, 3)
+        result = estimate_win_rate(team_a, team_b, args.target_ci, args.max_games, seed=args.seed)
+        total += result.games
+        low, high = result.interval
+        print(f"{', '.join(mon.name for mon in team_a)} vs {', '.join(mon.name for mon in team_b)}: "
+              f"{result.estimate:.2f} [{low:.2f}, {high:.2f}] after {result.games} games")
+    print(f"{total} games total, {args.matchups * args.max_games} with a fixed {args.max_games} per matchup")
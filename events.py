@@ -0,0 +1,34 @@
+from typing import NamedTuple
+
+#structured battle events, handed to run_battle's event sink (any callable, e.g. list.append)
+#names are passed through as-is, nothing here gets formatted into text
+
+class MoveEvent(NamedTuple):
+    turn: int
+    actor: str
+    move: str
+    damage: int
+    hp_after: int
+
+class MissEvent(NamedTuple):
+    turn: int
+    actor: str
+    move: str
+
+class StatusEvent(NamedTuple):
+    turn: int
+    target: str
+    status: str
+
+class SwitchEvent(NamedTuple):
+    turn: int
+    actor: str
+    replacement: str
+
+class FaintEvent(NamedTuple):
+    turn: int
+    mon: str
+
+class BattleEndEvent(NamedTuple):
+    turn: int
+    winner: str
@@ -0,0 +1,392 @@
+from collections import Counter
+from typing import NamedTuple
+
+import numpy as np
+
+from ability_effects import (
+    ATTACK_IF_STATUS, CONTACT_PARALYZE, CONTACT_BURN, CONTACT_INFATUATE,
+    check_immunity, modify_speed, boost_type_if_lowhp, should_heal_on_hit
+)
+from battle_state import BattleState, PLAYER, ENEMY
+from damage import BASE_CRIT_CHANCE, rolls
+from move_table import MOVE_ROWS, STATUSES, SPECIAL, STATUS, INFATUATE, CONFUSE, PARALYZE, BURN, TOXIC
+from script import MAX_TURNS, choose_best_move, start_battle
+
+#a mon's part of the state, everything about it that can change in a 1v1 and matters later.
+#turns_volatile and active_turns never change what happens so they're left out
+HP, PARALYZED, BURNED, POISONED, CONFUSED, INFATUATED, ASLEEP, FROZEN, TOXIC_COUNTER, ITEM_USED = range(10)
+FIELDS = {'paralyzed': PARALYZED, 'burned': BURNED, 'poisoned': POISONED, 'confused': CONFUSED,
+          'infatuated': INFATUATED, 'asleep': ASLEEP, 'frozen': FROZEN, 'toxic_counter': TOXIC_COUNTER}
+START = (100, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+#status moves (EFFECT_SPEECH in script.py) and what they set on the defender
+EFFECT_FIELDS = {INFATUATE: ((INFATUATED, 1),), CONFUSE: ((CONFUSED, 1),), PARALYZE: ((PARALYZED, 1),),
+                 BURN: ((BURNED, 1),), TOXIC: ((POISONED, 1), (TOXIC_COUNTER, 1))}
+CONTACT_FIELDS = {CONTACT_PARALYZE: PARALYZED, CONTACT_BURN: BURNED, CONTACT_INFATUATE: INFATUATED}
+#choose_best_move plays its status moves differently up to this turn, after that it never looks at the turn
+EARLY_TURNS = 3
+
+def _set(mon, *changes):
+    mon = list(mon)
+    for field, value in changes:
+        mon[field] = value
+    return tuple(mon)
+
+class ExactOutcome(NamedTuple):
+    player: float
+    enemy: float
+    draw: float
+    states: int     #distinct states the solver went through, counting each early turn separately
+
+    #what matchup_matrix stores, draws count as half
+    @property
+    def score(self):
+        return self.player + self.draw / 2
+
+#what doesn't change for one side of the matchup
+class _Side:
+    def __init__(self, mon):
+        self.mon = mon      #the BattleMon after start_battle, choose_best_move looks at it
+        self.stats = dict(mon.stats)
+        self.ability = mon.ability_effect
+        self.items = mon.item_hooks
+        self.speed = modify_speed(mon, None, mon.ability_effect)
+        self.choices = {}
+        self.healed = {}
+
+    #leftovers at the end of the turn
+    def end_of_turn(self, mon):
+        hook = self.items.end_turn
+        if not hook or mon[HP] <= 0:
+            return mon
+        healed = self.healed.get(mon)
+        if healed is None:
+            healed = self.healed[mon] = _set(mon, (HP, min(100, mon[HP] + max(1, int(mon[HP] * (hook.percent / 100))))))
+        return healed
+
+#chances of who wins a 1v1 between two sets under run_battle's rules and the greedy AI, worked out
+#exactly instead of sampled. each turn branches on everything run_battle rolls for (snapping out of
+#confusion, full paralysis, accuracy, crits, the 16 damage rolls, secondary and contact statuses),
+#each with its real chance. there's no weather because run_battle never starts any.
+#
+#the first EARLY_TURNS turns are a memoized recursion over (turn, player state, enemy state). after
+#that the moves only depend on the two mon states, so every state the battle can still reach is
+#found once and the rest of the turns up to the MAX_TURNS draw run as numpy backward induction.
+#long stalling matchups would otherwise redo the same states for every turn they could come up on
+class ExactSolver:
+    def __init__(self, player_set, enemy_set):
+        state = BattleState([player_set], [enemy_set])
+        start_battle(state)
+        self.sides = (_Side(state.active_mon(PLAYER)), _Side(state.active_mon(ENEMY)))
+        #speed ties go to the enemy
+        self.player_first = self.sides[PLAYER].speed > self.sides[ENEMY].speed
+        self.memo = {}
+        #(player, enemy) -> chances at the start of turn EARLY_TURNS + 1
+        self.late = {}
+        #the same two mon states come up again on later turns, an attack doesn't care which turn it is
+        self.attacks = {}
+        self.turns = {}
+
+    def solve(self):
+        #everything that's still going after the early turns
+        layer = {(START, START)}
+        for turn in range(1, EARLY_TURNS + 1):
+            layer = {(p, e) for player, enemy in layer for _, p, e in self._step(turn, player, enemy)[3]}
+        self._solve_late(layer)
+        player, enemy, draw = self._value(1, START, START)
+        return ExactOutcome(player, enemy, draw, len(self.memo) + len(self.late))
+
+    #choose_best_move only looks at the turn (<= 3), three hp cutoffs and two of the defender's flags
+    def _choose(self, side, turn, mon, other):
+        hp = mon[HP] / 100
+        key = (turn <= EARLY_TURNS, hp < 0.3, hp < 0.4, hp > 0.5, other[CONFUSED], other[INFATUATED])
+        move = side.choices.get(key)
+        if move is None:
+            defender = self.sides[1 - side.mon.side].mon
+            defender.confused, defender.infatuated = bool(other[CONFUSED]), bool(other[INFATUATED])
+            move = side.choices[key] = choose_best_move(side.mon, defender, turn, hp, verbose=False)
+        return move
+
+    def _step(self, turn, player, enemy):
+        player_move = self._choose(self.sides[PLAYER], turn, player, enemy)
+        enemy_move = self._choose(self.sides[ENEMY], turn, enemy, player)
+        return self._turn(player, enemy, player_move, enemy_move)
+
+    #(player wins, enemy wins, draw) chances from the start of an early turn
+    def _value(self, turn, player, enemy):
+        if turn > EARLY_TURNS:
+            return self.late[player, enemy]
+        key = (turn, player, enemy)
+        value = self.memo.get(key)
+        if value is not None:
+            return value
+
+        won, lost, drawn, going = self._step(turn, player, enemy)
+        for chance, p, e in going:
+            a, b, c = self._value(turn + 1, p, e)
+            won += chance * a
+            lost += chance * b
+            drawn += chance * c
+
+        value = self.memo[key] = (won, lost, drawn)
+        return value
+
+    #fills in self.late for the states in starts, going through every state reachable from them
+    def _solve_late(self, starts):
+        states = list(starts)
+        index = {state: i for i, state in enumerate(states)}
+        ends, src, dst, chances = [], [], [], []
+        for i, (player, enemy) in enumerate(states):
+            won, lost, drawn, going = self._step(EARLY_TURNS + 1, player, enemy)
+            ends.append((won, lost, drawn))
+            for chance, p, e in going:
+                j = index.get((p, e))
+                if j is None:
+                    j = index[p, e] = len(states)
+                    states.append((p, e))
+                src.append(i)
+                dst.append(j)
+                chances.append(chance)
+
+        n = len(states)
+        ends = np.array(ends).reshape(n, 3)
+        src, dst, chances = np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64), np.array(chances)
+        #whatever happens on the last turn, run_battle calls it a draw
+        values = np.zeros((n, 3))
+        values[:, 2] = 1.0
+        for _ in range(MAX_TURNS - 1 - EARLY_TURNS):
+            weighted = values[dst] * chances[:, None]
+            values = ends + np.stack([np.bincount(src, weighted[:, k], minlength=n) for k in range(3)], axis=1)
+        self.late = {state: tuple(value) for state, value in zip(states, values.tolist())}
+
+    #one turn with both moves picked, which doesn't depend on the turn number: the chances it ends
+    #the battle each way, and (chance, player, enemy) for every way it goes on
+    def _turn(self, player, enemy, player_move, enemy_move):
+        key = (player, enemy, player_move, enemy_move)
+        result = self.turns.get(key)
+        if result is not None:
+            return result
+
+        sides = self.sides
+        if self.player_first:
+            first, second, first_move, second_move = sides[PLAYER], sides[ENEMY], player_move, enemy_move
+            first_mon, second_mon = player, enemy
+        else:
+            first, second, first_move, second_move = sides[ENEMY], sides[PLAYER], enemy_move, player_move
+            first_mon, second_mon = enemy, player
+
+        #both attacks, the second one only if the first didn't knock anything out
+        after = {}
+        seen = after.get
+        for (f, s, fainted), chance in self._attack(first, second, first_mon, second_mon, first_move).items():
+            if fainted:
+                after[f, s] = seen((f, s), 0.0) + chance
+                continue
+            for (s2, f2, _), chance2 in self._attack(second, first, s, f, second_move).items():
+                after[f2, s2] = seen((f2, s2), 0.0) + chance * chance2
+
+        won = lost = drawn = 0.0
+        going = []
+        player_side, enemy_side = sides
+        for (f, s), chance in after.items():
+            p, e = (f, s) if self.player_first else (s, f)
+            p, e = player_side.end_of_turn(p), enemy_side.end_of_turn(e)
+            if p[HP] > 0 and e[HP] > 0:
+                going.append((chance, p, e))
+            elif p[HP] > 0:
+                won += chance
+            elif e[HP] > 0:
+                lost += chance
+            else:
+                drawn += chance
+
+        result = self.turns[key] = (won, lost, drawn, going)
+        return result
+
+    #one pass of play_turn's attack loop: {(attacker, defender, defender fainted): chance}
+    def _attack(self, att, dfn, a, d, move):
+        key = (att is self.sides[PLAYER], a, d, move)
+        out = self.attacks.get(key)
+        if out is not None:
+            return out
+        out = self.attacks[key] = Counter()
+        if d[HP] <= 0:
+            out[a, d, False] = 1.0
+            return out
+
+        branches = [(1.0, a)]
+        if a[INFATUATED] or a[CONFUSED]:
+            #0.3 snaps out and attacks, then half of the rest is too lost to move
+            out[a, d, False] += 0.35
+            branches = [(0.3, _set(a, (INFATUATED, 0), (CONFUSED, 0))), (0.35, a)]
+        moving = []
+        for chance, mon in branches:
+            if mon[PARALYZED]:
+                out[mon, d, False] += chance * 0.25
+                chance *= 0.75
+            if mon[ASLEEP] > 0:
+                out[_set(mon, (ASLEEP, mon[ASLEEP] - 1)), d, False] += chance
+            elif mon[FROZEN] > 0:
+                out[_set(mon, (FROZEN, mon[FROZEN] - 1)), d, False] += chance
+            else:
+                moving.append((chance, mon))
+        for chance, mon in moving:
+            self._hit(att, dfn, chance, mon, d, move, out)
+        return out
+
+    def _hit(self, att, dfn, chance, a, d, move, out):
+        #sitrus
+        hook = att.items.low_hp
+        if hook and not a[ITEM_USED] and a[HP] <= hook.threshold_hp:
+            a = _set(a, (HP, min(100, a[HP] + hook.heal)), (ITEM_USED, 1))
+
+        move_type_id, power, accuracy, category, effect, status_code, status_chance = MOVE_ROWS[move]
+        hit = min(max(accuracy, 0), 100) / 100
+        if hit < 1:
+            out[a, d, False] += chance * (1 - hit)
+            chance *= hit
+            if not chance:
+                return
+
+        if effect in EFFECT_FIELDS:
+            d = _set(d, *EFFECT_FIELDS[effect])
+
+        #cure items go off on anything that gets this far
+        hook = dfn.items.status
+        if hook and not d[ITEM_USED]:
+            if hook.status is None:
+                d = (d[HP],) + START[1:ITEM_USED] + (1,)
+            elif hook.status in FIELDS and d[FIELDS[hook.status]]:
+                d = _set(d, (FIELDS[hook.status], 0), (ITEM_USED, 1))
+
+        if category == STATUS or power == 0:
+            out[a, d, False] += chance
+            return
+        #atk always comes from modify_attack, whatever the category
+        atk = att.stats['atk']
+        if att.ability.kind == ATTACK_IF_STATUS and (a[BURNED] or a[POISONED] or a[PARALYZED] or a[ASLEEP] > 0 or a[CONFUSED]):
+            atk = atk * 1.5
+        defense = dfn.stats['spd' if category == SPECIAL else 'def']
+        eff = dfn.mon.defense[move_type_id]
+        if check_immunity(dfn.ability, move_type_id) or eff == 0.0:
+            out[a, d, False] += chance
+            return
+
+        on_move = att.items.on_move
+        if on_move and on_move.boost_type_id == move_type_id:
+            power = int(max(1, power) * on_move.multiplier)
+        crit = (on_move.crit_chance if on_move else BASE_CRIT_CHANCE) / 100
+        boost = boost_type_if_lowhp(att.mon, move_type_id, att.ability, a[HP] / 100)
+
+        if should_heal_on_hit(dfn.ability, move_type_id):
+            out[a, _set(d, (HP, min(100, d[HP] + 25))), False] += chance
+            return
+
+        #rolls past the defender's hp all end the same way, unless shell bell needs the real damage
+        shell_bell = att.items.on_damage_dealt
+        cap = float('inf') if shell_bell else d[HP]
+        damages = Counter()
+        for damage in rolls(int(power * boost), atk, defense, eff):
+            damages[min(damage, cap)] += (1 - crit) / 16
+        if crit:
+            for damage in rolls(int(int(power * 2) * boost), atk, defense, eff):
+                damages[min(damage, cap)] += crit / 16
+
+        status = STATUSES[status_code]
+        #freeze and crit_boost aren't tracked, same as run_battle
+        status_field = FIELDS.get(status)
+        landed = min(max(status_chance, 0), 100) / 100
+        contact_field = CONTACT_FIELDS.get(dfn.ability.kind)
+        attackers = [(chance, a)]
+        if contact_field is not None:
+            attackers = [(chance * 0.3, _set(a, (contact_field, 1))), (chance * 0.7, a)]
+        if not shell_bell:
+            attackers = [(attacker_chance, self._status_damage(mon)) for attacker_chance, mon in attackers]
+        for damage, damage_chance in damages.items():
+            hurt = _set(d, (HP, max(0, d[HP] - damage)))
+            fainted = hurt[HP] == 0
+            outcomes = [(damage_chance, hurt)]
+            if status_field is not None and landed and not hurt[status_field]:
+                outcomes = [(damage_chance * landed, _set(hurt, (status_field, 1)))]
+                if landed < 1:
+                    outcomes.append((damage_chance * (1 - landed), hurt))
+            for attacker_chance, mon in attackers:
+                if shell_bell:
+                    if damage > 0:
+                        mon = _set(mon, (HP, min(100, mon[HP] + max(1, int(damage * shell_bell.fraction)))))
+                    mon = self._status_damage(mon)
+                for defender_chance, hurt in outcomes:
+                    out[mon, hurt, fainted] += attacker_chance * defender_chance
+
+    #burn then poison on the attacker, after its hit
+    @staticmethod
+    def _status_damage(mon):
+        hp = mon[HP]
+        if mon[BURNED]:
+            hp -= max(1, hp // 8)
+        counter = mon[TOXIC_COUNTER]
+        if mon[POISONED]:
+            if counter > 0:
+                hp -= max(1, hp * counter // 16)
+                counter += 1
+            else:
+                hp -= max(1, hp // 8)
+        if hp == mon[HP]:
+            return mon
+        return _set(mon, (HP, hp), (TOXIC_COUNTER, counter))
+
+def solve_1v1(player_set, enemy_set):
+    return ExactSolver(player_set, enemy_set).solve()
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    from script import SILENT, load_pokemon_list, run_battle
+
+    parser = argparse.ArgumentParser(description="Exact 1v1 chances against matchup_matrix's sampled ones, on random pairs.")
+    parser.add_argument("--roster", default="L50R1P.csv")
+    parser.add_argument("--pairs", type=int, default=100)
+    parser.add_argument("--games", type=int, default=16, help="battles per pair on the sampled side")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    roster = load_pokemon_list(args.roster)
+    pick = random.Random(args.seed)
+    exact_time = sampled_time = 0.0
+    errors, flipped, clear_flipped, clear = [], 0, 0, 0
+    worst = None
+    for _ in range(args.pairs):
+        i, j = pick.randrange(len(roster)), pick.randrange(len(roster))
+        start = time.perf_counter()
+        exact = solve_1v1(roster[i], roster[j]).score
+        exact_time += time.perf_counter() - start
+
+        #same battles matchup_matrix plays for this pair
+        start = time.perf_counter()
+        score = 0.0
+        for g in range(args.games):
+            winner = run_battle([roster[i]], [roster[j]], verbosity=SILENT, rng=random.Random(f"{args.seed}:{i}:{j}:{g}"))
+            score += 1 if winner == "player" else 0.5 if winner == "draw" else 0
+        sampled = score / args.games
+        sampled_time += time.perf_counter() - start
+
+        error = abs(sampled - exact)
+        errors.append(error)
+        if worst is None or error > worst[0]:
+            worst = (error, i, j, exact, sampled)
+        #sampling says the other set is the favourite (or can't tell)
+        if abs(exact - 0.5) > 1e-9 and (sampled - 0.5) * (exact - 0.5) <= 0:
+            flipped += 1
+            if abs(exact - 0.5) > 0.1:
+                clear_flipped += 1
+        clear += abs(exact - 0.5) > 0.1
+
+    pairs = args.pairs
+    print(f"exact: {exact_time / pairs * 1e3:.1f} ms per pair, {args.games} battles: {sampled_time / pairs * 1e3:.1f} ms per pair")
+    print(f"sampling error: mean {sum(errors) / pairs:.3f}, max {max(errors):.3f}, "
+          f"off by more than 0.1 on {sum(e > 0.1 for e in errors) / pairs:.1%} of pairs")
+    print(f"wrong favourite on {flipped / pairs:.1%} of pairs, "
+          f"{clear_flipped}/{clear} where the favourite is clear (> 0.6)")
+    error, i, j, exact, sampled = worst
+    print(f"worst: {roster[i].name} vs {roster[j].name}, exact {exact:.3f}, sampled {sampled:.3f}")
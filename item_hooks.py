@@ -0,0 +1,75 @@
+from typing import NamedTuple
+
+from items import item_effects
+from type_chart import type_id
+
+#items compiled once into what they do at each point of a turn. a mon only gets looked at in a phase
+#if its item has a hook there, items the engine doesn't do anything with (brightpowder, king's rock,
+#white herb, liechi) compile to NO_ITEM_HOOKS
+
+#below threshold_hp, before attacking: heal a flat amount (sitrus)
+class LowHpHook(NamedTuple):
+    threshold_hp: float
+    heal: int
+
+#after being hit by a status move: status=None cures everything (lum), otherwise just that one
+class StatusHook(NamedTuple):
+    status: str = None
+
+#on the holder's damaging moves: boost_type_id moves get multiplier, and the crit chance to use.
+#boost_type_id is -1 for items that don't boost a type (scope lens)
+class OnMoveHook(NamedTuple):
+    boost_type_id: int = -1
+    multiplier: float = 1.0
+    crit_chance: float = 6.25
+
+#end of turn heal, percent of current hp (leftovers)
+class EndTurnHook(NamedTuple):
+    percent: float
+
+#holder heals a fraction of the damage it dealt (shell bell)
+class DamageDealtHook(NamedTuple):
+    fraction: float
+
+#chance to hang on at 1hp (focus band)
+class FatalHitHook(NamedTuple):
+    chance: float
+
+class ItemHooks(NamedTuple):
+    low_hp: LowHpHook = None
+    status: StatusHook = None
+    on_move: OnMoveHook = None
+    end_turn: EndTurnHook = None
+    on_damage_dealt: DamageDealtHook = None
+    fatal_hit: FatalHitHook = None
+
+NO_ITEM_HOOKS = ItemHooks()
+
+#+1 crit stage, 1/8 instead of 1/16
+SCOPE_LENS_CRIT = 12.5
+
+def compile_item(data):
+    trigger, effect = data.get('trigger'), data.get('effect')
+    if trigger == 'low_hp' and effect == 'heal_flat':
+        return ItemHooks(low_hp=LowHpHook(100 * data['threshold'], data['value']))
+    if trigger == 'status' and effect == 'cure_all_status':
+        return ItemHooks(status=StatusHook())
+    if trigger == 'status' and effect == 'cure_status':
+        return ItemHooks(status=StatusHook(data['status']))
+    if trigger == 'on_move' and effect == 'boost_type':
+        return ItemHooks(on_move=OnMoveHook(type_id(data['type']), data['multiplier']))
+    if trigger == 'on_move' and effect == 'crit_boost':
+        return ItemHooks(on_move=OnMoveHook(crit_chance=SCOPE_LENS_CRIT))
+    if trigger == 'end_turn' and effect == 'heal_percent':
+        return ItemHooks(end_turn=EndTurnHook(data['value']))
+    if trigger == 'on_damage_dealt' and effect == 'heal_fraction_damage':
+        return ItemHooks(on_damage_dealt=DamageDealtHook(data['multiplier']))
+    if trigger == 'fatal_hit' and effect == 'survive_1hp':
+        return ItemHooks(fatal_hit=FatalHitHook(data['chance']))
+    return NO_ITEM_HOOKS
+
+ITEM_HOOKS = {name: compile_item(data) for name, data in item_effects.items()}
+
+#what a set resolves its item to
+def item_hooks(name):
+    return ITEM_HOOKS.get(name, NO_ITEM_HOOKS)
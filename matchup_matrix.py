@@ -0,0 +1,137 @@
+import hashlib
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from exact import solve_1v1
+from roster import roster_key
+from script import ENGINE_VERSION, SILENT, load_pokemon_list, run_battle
+
+MATRIX_DIR = "matchups"
+
+#matrix[i, j] = chance set i (as player) beats set j 1v1, draws count as half.
+#NaN means that row hasn't been simulated yet. with exact=True the chances come from exact.py
+#instead of games battles per pair, so there's no sampling error and games/seed don't matter
+
+#anything that changes results changes the key, so a stale matrix is never picked up
+def matrix_key(roster_path="L50R1P.csv", games=16, seed=0, exact=False):
+    #roster_key covers the roster csv, basestats.csv and ROSTER_VERSION, the rest are the tables battles read
+    digest = hashlib.sha256(roster_key(roster_path).encode())
+    for path in ("move_types_full.py", "abilities.py", "items.py"):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    if exact:
+        digest.update(f"engine={ENGINE_VERSION}:exact".encode())
+    else:
+        digest.update(f"engine={ENGINE_VERSION}:games={games}:seed={seed}".encode())
+    return digest.hexdigest()[:16]
+
+def matrix_path(roster_path="L50R1P.csv", games=16, seed=0, exact=False):
+    return os.path.join(MATRIX_DIR, f"matchups_{matrix_key(roster_path, games, seed, exact)}.npy")
+
+_roster = None
+
+def _init_worker(roster_path):
+    global _roster
+    _roster = load_pokemon_list(roster_path)
+
+def _play_row(i, games, seed, exact=False):
+    row = np.empty(len(_roster), dtype=np.float32)
+    player = [_roster[i]]
+    for j, mon in enumerate(_roster):
+        if exact:
+            row[j] = solve_1v1(_roster[i], mon).score
+            continue
+        enemy = [mon]
+        score = 0.0
+        for g in range(games):
+            winner = run_battle(player, enemy, verbosity=SILENT, rng=random.Random(f"{seed}:{i}:{j}:{g}"))
+            if winner == "player":
+                score += 1
+            elif winner == "draw":
+                score += 0.5
+        row[j] = score / games
+    return i, row
+
+#fills in whatever rows are still NaN, a row is flushed to disk as soon as it's done
+#so killing this halfway loses at most the rows in flight. max_rows caps how many get done this run
+def build_matchup_matrix(roster_path="L50R1P.csv", games=16, seed=0, workers=None, max_rows=None, verbose=True,
+                         exact=False):
+    workers = workers or os.cpu_count() or 1
+    n = len(load_pokemon_list(roster_path))
+    path = matrix_path(roster_path, games, seed, exact)
+
+    if not os.path.exists(path):
+        #filled with NaN under another name first, a half made file at path would read as rows of 0
+        os.makedirs(MATRIX_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        matrix = open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(n, n))
+        matrix[:] = np.nan
+        matrix.flush()
+        del matrix
+        os.replace(tmp_path, path)
+    matrix = open_memmap(path, mode="r+")
+
+    todo = [i for i in range(n) if np.isnan(matrix[i]).any()]
+    if verbose:
+        print(f"{path}: {n - len(todo)}/{n} rows done")
+    if max_rows is not None:
+        todo = todo[:max_rows]
+
+    def store(i, row):
+        matrix[i] = row
+        matrix.flush()
+
+    if workers == 1:
+        _init_worker(roster_path)
+        for done, i in enumerate(todo, 1):
+            store(*_play_row(i, games, seed, exact))
+            if verbose and done % 10 == 0:
+                print(f"  {done}/{len(todo)} rows")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(roster_path,)) as pool:
+            futures = [pool.submit(_play_row, i, games, seed, exact) for i in todo]
+            for done, future in enumerate(as_completed(futures), 1):
+                store(*future.result())
+                if verbose and done % 10 == 0:
+                    print(f"  {done}/{len(todo)} rows")
+    return path
+
+#read-only view over a saved matrix, rows/cols are in roster (csv) order
+class MatchupMatrix:
+    def __init__(self, roster, path):
+        self.roster = roster
+        self.matrix = np.load(path, mmap_mode="r")
+        if self.matrix.shape != (len(roster), len(roster)):
+            raise ValueError(f"{path} is {self.matrix.shape}, roster has {len(roster)} sets")
+        self.index = {mon: i for i, mon in enumerate(roster)}
+
+    #NaN if that pair hasn't been simulated
+    def win_prob(self, mon, opponent):
+        return float(self.matrix[self.index[mon], self.index[opponent]])
+
+    def complete(self):
+        return not np.isnan(self.matrix).any()
+
+def load_matchup_matrix(roster, roster_path="L50R1P.csv", games=16, seed=0, exact=False):
+    path = matrix_path(roster_path, games, seed, exact)
+    if not os.path.exists(path):
+        return None
+    return MatchupMatrix(roster, path)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute 1v1 win chances for every pair of rental sets.")
+    parser.add_argument("--roster", default="L50R1P.csv")
+    parser.add_argument("--games", type=int, default=16, help="battles per pair")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-rows", type=int, default=None, help="stop after this many rows, rerun to carry on")
+    parser.add_argument("--exact", action="store_true", help="exact chances (exact.py) instead of sampled battles")
+    args = parser.parse_args()
+
+    print(build_matchup_matrix(args.roster, args.games, args.seed, args.workers, args.max_rows, exact=args.exact))
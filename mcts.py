@@ -0,0 +1,177 @@
+import math
+import random
+from time import perf_counter
+
+from battle_state import PLAYER, ENEMY
+from script import MAX_TURNS, battle_winner, cached_best_move, play_turn
+
+#one of our decisions. children are keyed by move slot, the tree is open loop: a node stands for the
+#moves we picked to get here, whatever the rolls were, so every playout replays from the root state
+class _Node:
+    __slots__ = ('children', 'visits', 'value')
+
+    def __init__(self):
+        self.children = {}
+        self.visits = 0
+        self.value = 0.0
+
+#monte carlo tree search as a run_battle policy(attacker, defender, state).
+#every playout clones the state (cheap, see BattleMon.clone), walks the tree with ucb1 to pick our
+#moves, adds one new node, and plays the rest of the battle out with the rollout policy on both sides
+#("greedy" is choose_best_move, "random" is any move). switching stays with should_switch.
+#a playout scores 1 for a win, 0.5 for a draw and 0 for a loss. rollouts cut short by max_rollout_turns
+#score our share of the hp left on the field. the most visited move gets played.
+#
+#with reuse_tree the subtree under the move we played becomes the next turn's root, as long as the
+#next call is the turn after with the same two mons out. the policy has its own rng for the playouts,
+#so the battle's rng is never touched. run_tournament and replay_game call start_game before every
+#game, which reseeds it from (seed, game index) and drops the old tree, so a game decides the same
+#way whichever worker plays it and whatever ran before it
+class MCTSPolicy:
+    def __init__(self, playouts=100, rollout="greedy", exploration=1.4, max_rollout_turns=None,
+                 reuse_tree=True, seed=0):
+        if rollout not in ("greedy", "random"):
+            raise ValueError(f"unknown rollout policy {rollout!r}")
+        #every playout has to get at least one of our moves into the tree
+        if playouts < 1:
+            raise ValueError(f"playouts has to be at least 1, got {playouts}")
+        if max_rollout_turns is not None and max_rollout_turns < 1:
+            raise ValueError(f"max_rollout_turns has to be at least 1, got {max_rollout_turns}")
+        self.playouts = playouts
+        self.exploration = exploration
+        self.max_rollout_turns = max_rollout_turns
+        self.reuse_tree = reuse_tree
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self._rollout = self._greedy if rollout == "greedy" else self._random
+        self._policies = (self._rollout, self._rollout)
+        self._next_root = None
+        self._next_key = None
+        self.decisions = 0
+        self.reused = 0
+        self.rollouts = 0
+        self.turns = 0
+        self.seconds = 0.0
+
+    def start_game(self, seed, index):
+        self.rng = random.Random(f"{self.seed}:{seed}:{index}")
+        self._next_root = None
+        self._next_key = None
+
+    def __call__(self, attacker, defender, state):
+        start = perf_counter()
+        side = attacker.side
+        root = None
+        if self.reuse_tree and self._next_key == (side, state.turn, attacker.set, defender.set):
+            root = self._next_root
+            self.reused += 1
+        if root is None:
+            root = _Node()
+
+        for _ in range(self.playouts):
+            self._playout(root, state, side)
+
+        slot = max(root.children, key=lambda s: root.children[s].visits)
+        self._next_root = root.children[slot]
+        self._next_key = (side, state.turn + 1, attacker.set, defender.set)
+        self.decisions += 1
+        self.seconds += perf_counter() - start
+        return attacker.moves[slot]
+
+    def _playout(self, root, state, side):
+        sim = state.clone()
+        path = [root]
+        node = root
+
+        #our side's policy for this playout: down the tree while we're in it, rollout after
+        def ours(attacker, defender, st):
+            nonlocal node
+            if node is None:
+                return self._rollout(attacker, defender, st)
+            slots = range(len(attacker.moves))
+            untried = [s for s in slots if s not in node.children]
+            if untried:
+                slot = self.rng.choice(untried)
+                child = node.children[slot] = _Node()
+                path.append(child)
+                node = None
+                return attacker.moves[slot]
+            log_visits = math.log(node.visits)
+            best, best_score = None, float('-inf')
+            for s in slots:
+                child = node.children[s]
+                score = child.value / child.visits + self.exploration * math.sqrt(log_visits / child.visits)
+                if score > best_score:
+                    best, best_score = s, score
+            node = node.children[best]
+            path.append(node)
+            return attacker.moves[best]
+
+        policies = (ours, self._rollout) if side == PLAYER else (self._rollout, ours)
+        #the turn we were called in is already past its switches
+        switch = False
+        turns = 0
+        while sim.active_mon(PLAYER).hp > 0 and sim.active_mon(ENEMY).hp > 0 and sim.turn <= MAX_TURNS:
+            if self.max_rollout_turns is not None and turns >= self.max_rollout_turns:
+                break
+            play_turn(sim, self.rng, policies, switch=switch)
+            switch = True
+            turns += 1
+        self.rollouts += 1
+        self.turns += turns
+
+        score = self._score(sim, side)
+        for n in path:
+            n.visits += 1
+            n.value += score
+
+    @staticmethod
+    def _score(sim, side):
+        over = sim.active_mon(PLAYER).hp <= 0 or sim.active_mon(ENEMY).hp <= 0
+        if sim.turn > MAX_TURNS:
+            return 0.5
+        if over:
+            winner = battle_winner(sim)
+            if winner == "draw":
+                return 0.5
+            return 1.0 if (winner == "player") == (side == PLAYER) else 0.0
+        ours = sum(max(0, mon.hp) for mon in sim.teams[side])
+        theirs = sum(max(0, mon.hp) for mon in sim.teams[1 - side])
+        return ours / (ours + theirs) if ours + theirs else 0.5
+
+    def _greedy(self, attacker, defender, st):
+        return cached_best_move(attacker, defender, st.turn, attacker.hp / 100)
+
+    def _random(self, attacker, defender, st):
+        return self.rng.choice(attacker.moves)
+
+    def report(self):
+        decisions = self.decisions or 1
+        return (f"{self.decisions} decisions ({self.reused} on a reused tree), {self.seconds / decisions * 1e3:.1f} ms each, "
+                f"{self.rollouts / (self.seconds or 1):.0f} rollouts/s, {self.turns / (self.rollouts or 1):.1f} turns per rollout")
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from tournament import run_tournament
+
+    parser = argparse.ArgumentParser(description="MCTS (player side) against the greedy AI.")
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--playouts", type=int, default=100)
+    parser.add_argument("--rollout", choices=["greedy", "random"], default="greedy")
+    parser.add_argument("--max-rollout-turns", type=int, default=None)
+    parser.add_argument("--no-reuse", action="store_true")
+    args = parser.parse_args()
+
+    greedy, _ = run_tournament(args.games, workers=1, seed=args.seed)
+    policy = MCTSPolicy(args.playouts, args.rollout, max_rollout_turns=args.max_rollout_turns,
+                        reuse_tree=not args.no_reuse, seed=args.seed)
+    start = time.perf_counter()
+    searched, _ = run_tournament(args.games, workers=1, seed=args.seed, policies=(policy, None))
+    elapsed = time.perf_counter() - start
+
+    print(f"greedy vs greedy: {greedy}")
+    print(f"  mcts vs greedy: {searched} ({args.games / elapsed:.2f} battles/s)")
+    print(policy.report())
@@ -0,0 +1,69 @@
+import numpy as np
+
+from move_types_full import move_types
+from type_chart import NO_TYPE, SE_MASKS, type_id
+
+#categories
+PHYSICAL, SPECIAL, STATUS = 0, 1, 2
+CATEGORIES = ['Physical', 'Special', 'Status']
+
+#effect codes the engine/AI actually look at, anything else in move_types gets a code after these
+(NO_EFFECT, INFATUATE, CONFUSE, PARALYZE, BURN, TOXIC, SLEEP,
+ HEAL, RAIN, SUN, PROTECT, SUBSTITUTE) = range(12)
+EFFECTS = ['', 'infatuate', 'confuse', 'paralyze', 'burn', 'toxic', 'sleep',
+           'heal', 'rain', 'sun', 'protect', 'substitute']
+EFFECTS += sorted({d.get('effect') or '' for d in move_types.values()} - set(EFFECTS))
+
+#secondary statuses, 0 means none
+STATUSES = [None] + sorted({d['status'] for d in move_types.values() if d.get('status')})
+
+#id 0 is "no move", what choose_best_move hands back when nothing can hit
+NO_MOVE = 0
+
+#every move gets an int id and its fields live in parallel arrays,
+#rows has the same data as plain tuples for the per-action lookups in run_battle
+class MoveTable:
+    def __init__(self, moves):
+        self.names = ['(no move)'] + sorted(moves)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+        effect_ids = {e: i for i, e in enumerate(EFFECTS)}
+        status_ids = {s: i for i, s in enumerate(STATUSES)}
+        category_ids = {c: i for i, c in enumerate(CATEGORIES)}
+
+        rows = [(NO_TYPE, 0, 100, STATUS, NO_EFFECT, 0, 0)]
+        for name in self.names[1:]:
+            data = moves[name]
+            rows.append((
+                type_id(data.get('type', '')),
+                data.get('power', 0),
+                data.get('accuracy', 100),
+                category_ids.get(data.get('category'), STATUS),
+                effect_ids[data.get('effect') or ''],
+                status_ids[data.get('status')],
+                data.get('status_chance', 0),
+            ))
+        self.rows = rows
+
+        columns = list(zip(*rows))
+        self.type_id = np.array(columns[0], dtype=np.int8)
+        self.power = np.array(columns[1], dtype=np.int16)
+        self.accuracy = np.array(columns[2], dtype=np.int16)
+        self.category = np.array(columns[3], dtype=np.int8)
+        self.effect_code = np.array(columns[4], dtype=np.int8)
+        self.status_code = np.array(columns[5], dtype=np.int8)
+        self.status_chance = np.array(columns[6], dtype=np.int16)
+        #bitmask of defending types each move is super effective against, no move hits nothing
+        self.se_masks = [0] + [SE_MASKS[row[0]] for row in rows[1:]]
+        self.se_mask = np.array(self.se_masks, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.names)
+
+    #unknown moves end up as NO_MOVE, same as move_types.get(move, {}) used to
+    def id_of(self, name):
+        return self.ids.get(name, NO_MOVE)
+
+MOVES = MoveTable(move_types)
+MOVE_ROWS = MOVES.rows
+MOVE_NAMES = MOVES.names
@@ -1,14 +1,170 @@
-class Pokemon:
-    def __init__(self, name, types, moves, stats, item, ability):
-        self.name = name
-        self.types = types
-        self.moves = moves
-        self.stats = stats
-        self.item = item
-        self.ability = ability
-    
+from functools import reduce
+from operator import or_
+from types import MappingProxyType
+
+from ability_effects import ability_effect
+from item_hooks import item_hooks
+from move_table import MOVES, MOVE_NAMES
+from type_chart import DUAL_MATRIX, NO_TYPE, defending_type_ids, move_effectiveness, type_mask
+
+STAT_KEYS = ('hp', 'atk', 'def', 'spa', 'spd', 'spe')
+
+#a rental set, shared by every battle that uses it so nothing is allowed to change it
+class PokemonSet:
+    __slots__ = ('name', 'types', 'moves', 'stats', 'base_stats', 'item', 'ability',
+                 'type_ids', 'stab_type_ids', 'move_type_ids', 'defense',
+                 'type_mask', 'move_mask', 'se_mask', 'ability_effect', 'item_hooks')
+
+    def __init__(self, name, types, moves, stats, item, ability, base_stats=None):
+        init = object.__setattr__
+        init(self, 'name', name)
+        init(self, 'types', tuple(types))
+        #move ids into the MoveTable, move_names has the strings back
+        init(self, 'moves', tuple(MOVES.id_of(m) for m in moves))
+        #plain ints, numpy scalars out of the csv make every damage calc slower
+        init(self, 'stats', MappingProxyType({k: int(v) for k, v in stats.items()}))
+        #species base stats, what team scoring rates a mon on. same as stats if we weren't given them
+        init(self, 'base_stats', self.stats if base_stats is None else MappingProxyType({k: int(v) for k, v in base_stats.items()}))
+        init(self, 'item', item)
+        init(self, 'ability', ability)
+        #parsed ability, so the battle loop never looks at the effect string
+        init(self, 'ability_effect', ability_effect(ability))
+        #same for the item, one hook per phase it does something in
+        init(self, 'item_hooks', item_hooks(item))
+
+        #type ids so effectiveness is just an index
+        type_ids = defending_type_ids(types)
+        init(self, 'type_ids', type_ids)
+        init(self, 'stab_type_ids', frozenset(type_ids) - {NO_TYPE})
+        init(self, 'move_type_ids', tuple(MOVES.rows[m][0] for m in self.moves))
+        #defense[attacking type id] = combined multiplier against this mon
+        init(self, 'defense', tuple(DUAL_MATRIX[:, type_ids[0], type_ids[1]].tolist()))
+
+        #bitsets for team scoring: our types, our move ids, and every type some move of ours hits super effectively
+        init(self, 'type_mask', type_mask(self.types))
+        init(self, 'move_mask', reduce(or_, (1 << m for m in self.moves), 0))
+        init(self, 'se_mask', reduce(or_, (MOVES.se_masks[m] for m in self.moves), 0))
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"PokemonSet is frozen, can't set {key}")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"PokemonSet is frozen, can't delete {key}")
+
+    #slots + frozen needs its own pickling so rosters can go to worker processes
+    def __reduce__(self):
+        return (PokemonSet, (self.name, self.types, self.move_names, dict(self.stats), self.item, self.ability,
+                             dict(self.base_stats)))
+
+    @property
+    def move_names(self):
+        return [MOVE_NAMES[m] for m in self.moves]
+
+    #effectiveness of all of our moves against defender at once
+    def move_effectiveness(self, defender):
+        return move_effectiveness(self.move_type_ids, defender.type_ids)
+
     def __str__(self):
-        return f"{self.name} ({'/'.join(self.types)}): {', '.join(self.moves)}"
-    
+        return f"{self.name} ({'/'.join(self.types)}): {', '.join(self.move_names)}"
+
     def __repr__(self):
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
+
+#old name, everything that builds rosters still calls it this
+Pokemon = PokemonSet
+
+#status fields on BattleMon, bools except the turn/counter ones
+STATUS_KEYS = ('paralyzed', 'burned', 'poisoned', 'confused', 'infatuated', 'asleep', 'frozen', 'turns_volatile', 'toxic_counter')
+COUNTER_STATUSES = ('asleep', 'frozen', 'turns_volatile', 'toxic_counter')
+
+#everything about a mon that changes during one battle, made fresh per battle from its set.
+#side (0 player, 1 enemy) and slot (0-5) say where it sits in the BattleState
+class BattleMon:
+    __slots__ = ('set', 'side', 'slot', 'hp', 'stats', 'stages', 'item_used', 'active_turns',
+                 'paralyzed', 'burned', 'poisoned', 'confused', 'infatuated',
+                 'asleep', 'frozen', 'turns_volatile', 'toxic_counter',
+                 'name', 'types', 'moves', 'item', 'item_hooks', 'ability', 'ability_effect',
+                 'type_ids', 'stab_type_ids', 'move_type_ids', 'defense')
+
+    def __init__(self, pokemon_set, side=0, slot=0):
+        self.set = pokemon_set
+        self.side = side
+        self.slot = slot
+        self.hp = 100
+        #stats after drops like intimidate, the set's own stats never change
+        self.stats = dict(pokemon_set.stats)
+        self.stages = dict.fromkeys(STAT_KEYS, 0)
+        self.item_used = False
+        self.active_turns = 0
+        self.clear_status()
+
+        #read-only stuff copied off the set so the battle loop doesn't have to go through .set
+        self.name = pokemon_set.name
+        self.types = pokemon_set.types
+        self.moves = pokemon_set.moves
+        self.item = pokemon_set.item
+        self.item_hooks = pokemon_set.item_hooks
+        self.ability = pokemon_set.ability
+        self.ability_effect = pokemon_set.ability_effect
+        self.type_ids = pokemon_set.type_ids
+        self.stab_type_ids = pokemon_set.stab_type_ids
+        self.move_type_ids = pokemon_set.move_type_ids
+        self.defense = pokemon_set.defense
+
+    def clear_status(self):
+        self.paralyzed = False
+        self.burned = False
+        self.poisoned = False
+        self.confused = False
+        self.infatuated = False
+        self.asleep = 0
+        self.frozen = 0
+        self.turns_volatile = 0
+        self.toxic_counter = 0
+
+    #stats and stages can be shared with clones (copy on write), so anything about to change
+    #them calls this first to get this mon its own copy
+    def own_stats(self):
+        self.stats = dict(self.stats)
+        self.stages = dict(self.stages)
+
+    #flat field copy. stats and stages are shared, they only ever change through own_stats()
+    #so rollouts can clone a state every playout without copying any dicts
+    def clone(self):
+        new = BattleMon.__new__(BattleMon)
+        new.set = self.set
+        new.side = self.side
+        new.slot = self.slot
+        new.hp = self.hp
+        new.stats = self.stats
+        new.stages = self.stages
+        new.item_used = self.item_used
+        new.active_turns = self.active_turns
+        new.paralyzed = self.paralyzed
+        new.burned = self.burned
+        new.poisoned = self.poisoned
+        new.confused = self.confused
+        new.infatuated = self.infatuated
+        new.asleep = self.asleep
+        new.frozen = self.frozen
+        new.turns_volatile = self.turns_volatile
+        new.toxic_counter = self.toxic_counter
+        new.name = self.name
+        new.types = self.types
+        new.moves = self.moves
+        new.item = self.item
+        new.item_hooks = self.item_hooks
+        new.ability = self.ability
+        new.ability_effect = self.ability_effect
+        new.type_ids = self.type_ids
+        new.stab_type_ids = self.stab_type_ids
+        new.move_type_ids = self.move_type_ids
+        new.defense = self.defense
+        return new
+
+    @property
+    def move_names(self):
+        return self.set.move_names
+
+    def __repr__(self):
+        return f"{self.name} ({self.hp}/100)"
@@ -0,0 +1,73 @@
+from time import perf_counter_ns
+
+#phases of run_battle. setup is building the state and on-entry abilities, the rest are per turn
+(SETUP, SWITCHING, TURN_ORDER, MOVE_CHOICE, STATUS_CHECKS, ITEMS, DAMAGE, END_OF_TURN, FAINT) = range(9)
+PHASE_NAMES = ['setup', 'switching', 'turn order', 'move choice', 'status checks', 'items', 'damage',
+               'end of turn', 'faint handling']
+
+#pass one to run_battle(profiler=...) and it gets told every time the battle moves to a new phase.
+#time between two enter() calls is charged to the phase that was running, so an early `continue`
+#out of a phase still gets charged to the right one. run_battle without a profiler only pays an
+#`if prof:` at each phase boundary
+class PhaseProfiler:
+    def __init__(self):
+        self.ns = [0] * len(PHASE_NAMES)
+        self.calls = [0] * len(PHASE_NAMES)     #times each phase was entered from a different one
+        self.battles = 0
+        self._phase = SETUP
+        self._mark = 0
+
+    def start_battle(self):
+        self.battles += 1
+        self.calls[SETUP] += 1
+        self._phase = SETUP
+        self._mark = perf_counter_ns()
+
+    def enter(self, phase):
+        now = perf_counter_ns()
+        self.ns[self._phase] += now - self._mark
+        if phase != self._phase:
+            self.calls[phase] += 1
+            self._phase = phase
+        self._mark = now
+
+    def end_battle(self):
+        self.ns[self._phase] += perf_counter_ns() - self._mark
+
+    def merge(self, other):
+        for i in range(len(PHASE_NAMES)):
+            self.ns[i] += other.ns[i]
+            self.calls[i] += other.calls[i]
+        self.battles += other.battles
+
+    def as_dict(self):
+        return {name: {'ns': self.ns[i], 'calls': self.calls[i]} for i, name in enumerate(PHASE_NAMES)}
+
+    #one line per phase: total time, share of the total, and per battle time and entries
+    def report(self):
+        total = sum(self.ns) or 1
+        battles = self.battles or 1
+        lines = [f"{'phase':>15} {'total ms':>10} {'share':>7} {'us/battle':>10} {'entries/battle':>15}"]
+        for i in sorted(range(len(PHASE_NAMES)), key=lambda i: -self.ns[i]):
+            lines.append(f"{PHASE_NAMES[i]:>15} {self.ns[i] / 1e6:10.1f} {self.ns[i] / total:7.1%} "
+                         f"{self.ns[i] / battles / 1e3:10.1f} {self.calls[i] / battles:15.1f}")
+        lines.append(f"{self.battles} battles, {total / 1e6:.1f} ms, {total / battles / 1e3:.1f} us per battle")
+        return "\n".join(lines)
+
+if __name__ == "__main__":
+    import argparse
+
+    import tournament
+    from script import SILENT, run_battle
+
+    parser = argparse.ArgumentParser(description="Where run_battle spends its time, phase by phase.")
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tournament._init_worker("L50R1P.csv")
+    profiler = PhaseProfiler()
+    for i in range(args.games):
+        player_team, enemy_team = tournament.game_teams(args.seed, i)
+        run_battle(player_team, enemy_team, verbosity=SILENT, rng=tournament.game_rng(args.seed, i), profiler=profiler)
+    print(profiler.report())
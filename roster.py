@@ -0,0 +1,203 @@
+import hashlib
+import os
+import pickle
+import random
+from functools import lru_cache
+
+import numpy as np
+
+from pokemon import PokemonSet, STAT_KEYS
+from stat_calc import calc_stats, parse_ev_spreads
+
+#parsed rosters get pickled here, one file per set csv
+ROSTER_CACHE_DIR = "roster_cache"
+#bump when the way a csv row turns into a PokemonSet changes, every cached roster gets rebuilt
+ROSTER_VERSION = 3
+
+#pandas only gets imported the first time something actually needs a csv parsed
+@lru_cache(maxsize=None)
+def base_stats(path="basestats.csv"):
+    import pandas as pd
+    df = pd.read_csv(path)
+    df.columns = [col.strip().lower().replace(" ", "_") for col in df.columns]
+    df.set_index("name", inplace=True)
+    return df
+
+#choose random set
+def parse_random_ability(possible):
+    import pandas as pd
+    if pd.isna(possible):
+        return None
+    options = [a.strip() for a in possible.split("/")]
+    return random.choice(options)
+
+#parse pokemon and random ability
+def build_rental_pool(df, count=6):
+    pool_rows = df.sample(n=count)
+    updated_rows = []
+    for _, row in pool_rows.iterrows():
+        row = row.copy()
+        row["ability"] = parse_random_ability(row["possible_ability"])
+        updated_rows.append(row_to_pokemon(row))
+    return updated_rows
+
+#base stats for each species, (n, 6) in STAT_KEYS order plus which ones we actually found
+def species_base_stats(species, base_stats_path="basestats.csv"):
+    import pandas as pd
+    base = base_stats(base_stats_path)[list(BASE_STAT_COLUMNS)].rename(columns=BASE_STAT_COLUMNS)
+    base = base[~base.index.duplicated()]
+    merged = pd.DataFrame({'species': species}).merge(base, how='left', left_on='species', right_index=True)
+    found = merged['hp'].notna().to_numpy()
+    stats = np.full((len(species), len(STAT_KEYS)), 100, dtype=np.int64)
+    stats[found] = merged.loc[found, list(STAT_KEYS)].to_numpy(dtype=np.int64)
+    return stats, found
+
+#turns our silly little pokemon into data
+def row_to_pokemon(row, base_stats_path="basestats.csv"):
+    import pandas as pd
+    name = row['species']
+    types = row['type'].split() if pd.notna(row['type']) else []
+    moves = [row[f'move_{i}'] for i in range(1, 5)]
+
+    base, found = species_base_stats([name], base_stats_path)
+    if not found[0]:
+        print(f"Could not find base stats for: {name}")
+    stats = calc_stats(base, parse_ev_spreads([row.get('ev_spread')]), [row.get('nature')])
+
+    item = row['item']
+
+    return PokemonSet(name, types, moves, dict(zip(STAT_KEYS, stats[0].tolist())), item=item,
+                      ability=row.get("ability", None), base_stats=dict(zip(STAT_KEYS, base[0].tolist())))
+
+#basestats.csv column -> our stat key
+BASE_STAT_COLUMNS = {'hp': 'hp', 'attack': 'atk', 'defense': 'def', 'sp._atk': 'spa', 'sp._def': 'spd', 'speed': 'spe'}
+
+#a whole set file as columns, one entry per csv row. stats (level 50 stats) and base_stats are
+#(n, 6) int arrays in STAT_KEYS order. PokemonSets only get built when something asks for one, and then they're kept
+class Roster:
+    def __init__(self, species, types, moves, items, abilities, stats, base_stats, listed_speed=None):
+        self.species = species          #names
+        self.types = types              #tuple of type names per row
+        self.moves = moves              #tuple of 4 move names per row
+        self.items = items
+        self.abilities = abilities
+        self.stats = stats
+        self.base_stats = base_stats
+        self.listed_speed = listed_speed    #the csv's own Speed column, if it has one
+        self._sets = [None] * len(species)
+
+    def __len__(self):
+        return len(self.species)
+
+    def __getitem__(self, i):
+        mon = self._sets[i]
+        if mon is None:
+            stats = dict(zip(STAT_KEYS, self.stats[i].tolist()))
+            base_stats = dict(zip(STAT_KEYS, self.base_stats[i].tolist()))
+            mon = PokemonSet(self.species[i], self.types[i], self.moves[i], stats,
+                             item=self.items[i], ability=self.abilities[i], base_stats=base_stats)
+            self._sets[i] = mon
+        return mon
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def sets(self):
+        return list(self)
+
+    #rows whose calculated speed doesn't match the csv's Speed column
+    def speed_mismatches(self):
+        if self.listed_speed is None:
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero(self.stats[:, STAT_KEYS.index('spe')] != self.listed_speed)
+
+    #only the columns get pickled, sets are cheap to rebuild
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_sets']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._sets = [None] * len(self.species)
+
+#the whole csv in one go: one merge against basestats, then the gen 3 stat formula over every row at once
+def parse_roster(path="L50R1P.csv", base_stats_path="basestats.csv"):
+    import pandas as pd
+    df = pd.read_csv(path)
+    df.columns = [col.strip().lower().replace(" ", "_") for col in df.columns]
+    n = len(df)
+
+    base, found = species_base_stats(df['species'].tolist(), base_stats_path)
+    missing = sorted(set(df['species'][~found]))
+    if missing:
+        print(f"Could not find base stats for {len(missing)} species ({(~found).sum()} sets), using 100s: {', '.join(missing)}")
+
+    evs = parse_ev_spreads(df['ev_spread'].tolist() if 'ev_spread' in df else [None] * n)
+    natures = df['nature'].tolist() if 'nature' in df else [None] * n
+    stats = calc_stats(base, evs, natures)
+    listed_speed = df['speed'].to_numpy(dtype=np.int64) if 'speed' in df else None
+
+    types = [tuple(t.split()) if isinstance(t, str) else () for t in df['type']]
+    moves = list(zip(*(df[f'move_{i}'].tolist() for i in range(1, 5))))
+    items = [item if isinstance(item, str) else None for item in df['item']]
+    abilities = df['ability'].tolist() if 'ability' in df else [None] * n
+    return Roster(df['species'].tolist(), types, moves, items, abilities, stats, base, listed_speed)
+
+#hash of everything the parsed roster depends on
+def roster_key(path="L50R1P.csv", base_stats_path="basestats.csv"):
+    digest = hashlib.sha256(f"roster={ROSTER_VERSION}".encode())
+    for source in (path, base_stats_path):
+        with open(source, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def roster_cache_path(path="L50R1P.csv"):
+    return os.path.join(ROSTER_CACHE_DIR, os.path.basename(path) + ".pkl")
+
+#the parsed roster, straight from the pickle if it was made from these exact csvs.
+#anything wrong with the cache just means parsing again and rewriting it
+def load_roster(path="L50R1P.csv", base_stats_path="basestats.csv", use_cache=True):
+    if not use_cache:
+        return parse_roster(path, base_stats_path)
+
+    key = roster_key(path, base_stats_path)
+    cache_path = roster_cache_path(path)
+    try:
+        with open(cache_path, "rb") as f:
+            cached_key, roster = pickle.load(f)
+        if cached_key == key:
+            return roster
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError):
+        pass
+
+    roster = parse_roster(path, base_stats_path)
+    os.makedirs(ROSTER_CACHE_DIR, exist_ok=True)
+    #write then rename, so worker processes starting together never read half a file
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((key, roster), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return roster
+
+#every set in the file as PokemonSets
+def load_pokemon_list(path="L50R1P.csv", base_stats_path="basestats.csv", use_cache=True):
+    return load_roster(path, base_stats_path, use_cache).sets()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parse a set file and check its calculated speeds against its Speed column.")
+    parser.add_argument("path", nargs="?", default="L50R1P.csv")
+    parser.add_argument("--base-stats", default="basestats.csv")
+    args = parser.parse_args()
+
+    roster = parse_roster(args.path, args.base_stats)
+    if roster.listed_speed is None:
+        print(f"{args.path} has no Speed column to check against")
+    else:
+        bad = roster.speed_mismatches()
+        spe = STAT_KEYS.index('spe')
+        for i in bad:
+            print(f"row {i}: {roster.species[i]} calculated {roster.stats[i, spe]}, csv says {roster.listed_speed[i]}")
+        print(f"{len(roster) - len(bad)}/{len(roster)} speeds match")
@@ -0,0 +1,80 @@
+import numpy as np
+
+from roster import load_roster
+
+#draws rental pools and opponent teams as arrays of roster row indices, lots at a time.
+#a draw is only kept if it follows the factory rules: no species twice in a team, no item twice in a team,
+#and opponents can be kept off the player's species. everything comes from the numpy Generator you pass in
+class RentalSampler:
+    #rosters is one Roster per round (round 0 first), indices drawn for a round are rows of that round's roster
+    def __init__(self, rosters):
+        self.rosters = list(rosters)
+        self.species_ids = []
+        self.item_ids = []
+        species_codes = {}
+        item_codes = {}
+        for roster in self.rosters:
+            self.species_ids.append(np.array([species_codes.setdefault(s, len(species_codes)) for s in roster.species],
+                                             dtype=np.int32))
+            #sets without an item never clash with each other, so each gets its own negative id
+            self.item_ids.append(np.array([item_codes.setdefault(item, len(item_codes)) if item is not None else -1 - i
+                                           for i, item in enumerate(roster.items)], dtype=np.int32))
+
+    #n rows of size distinct-species, distinct-item set indices from one round.
+    #exclude_species is an optional (n, m) array of species ids row i may not use
+    def draw(self, n, size, rng, round=0, exclude_species=None):
+        species_ids, item_ids = self.species_ids[round], self.item_ids[round]
+        #worked on slot-major, (size, n), so every check is a compare of two contiguous columns
+        out = np.empty((size, n), dtype=np.intp)
+        excluded = None if exclude_species is None else np.ascontiguousarray(exclude_species.T)
+        todo = np.arange(n)
+        while len(todo):
+            picks = rng.integers(0, len(species_ids), size=(size, len(todo)))
+            species = species_ids[picks]
+            ok = _all_distinct(species) & _all_distinct(item_ids[picks])
+            if excluded is not None:
+                for banned in excluded[:, todo]:
+                    for slot in species:
+                        ok &= slot != banned
+            out[:, todo[ok]] = picks[:, ok]
+            todo = todo[~ok]
+        return out.T
+
+    #player rental pools plus an opponent team for each, opponents share no species with their pool
+    def draw_matchups(self, n, rng, pool_size=6, team_size=3, round=0):
+        pools = self.draw(n, pool_size, rng, round)
+        opponents = self.draw(n, team_size, rng, round, exclude_species=self.species_ids[round][pools])
+        return pools, opponents
+
+    def team(self, indices, round=0):
+        roster = self.rosters[round]
+        return [roster[i] for i in indices]
+
+#true for columns with no value repeated down them, rows is (size, n)
+def _all_distinct(rows):
+    ok = np.ones(rows.shape[1], dtype=bool)
+    for i in range(len(rows)):
+        for j in range(i + 1, len(rows)):
+            ok &= rows[i] != rows[j]
+    return ok
+
+def load_sampler(paths=("L50R1P.csv",), base_stats_path="basestats.csv"):
+    return RentalSampler([load_roster(path, base_stats_path) for path in paths])
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Time batched rental pool draws.")
+    parser.add_argument("--pools", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sampler = load_sampler()
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    for _ in range(0, args.pools, args.batch):
+        sampler.draw_matchups(args.batch, rng)
+    elapsed = time.perf_counter() - start
+    print(f"{args.pools} pools + opponent teams in {elapsed:.2f}s, {args.pools / elapsed:,.0f} per second")
@@ -1,14 +1,21 @@
-import pandas as pd
 import random
-import matplotlib.pyplot as plt
 import csv
-from itertools import combinations
-from pokemon import Pokemon
-from type_chart import type_chart
-from move_types_full import move_types
-from items import item_effects
-from abilities import abilities as ability_lookup
+from functools import lru_cache
+from typing import NamedTuple
+from pokemon import BattleMon, STATUS_KEYS, COUNTER_STATUSES
+from battle_state import BattleState, PLAYER, ENEMY
+from type_chart import type_chart, TYPES, TYPE_EFF, TYPE_IDS, type_id, type_mask
+from move_table import (
+    MOVES, MOVE_ROWS, MOVE_NAMES, NO_MOVE, STATUSES, SPECIAL, STATUS,
+    INFATUATE, CONFUSE, PARALYZE, BURN, TOXIC, SLEEP, HEAL, RAIN, SUN, PROTECT, SUBSTITUTE
+)
+#csv parsing lives in roster.py now, these stay importable from here
+from roster import load_pokemon_list, row_to_pokemon, build_rental_pool, parse_random_ability
+from profiler import SWITCHING, TURN_ORDER, MOVE_CHOICE, STATUS_CHECKS, ITEMS, DAMAGE, END_OF_TURN, FAINT
+from damage import hit_damage
+from events import MoveEvent, MissEvent, StatusEvent, SwitchEvent, FaintEvent, BattleEndEvent
 from ability_effects import (
+    ON_ENTRY_LOWER,
     check_immunity,
     modify_attack,
     modify_speed,
@@ -21,176 +28,177 @@ from ability_effects import (
 
 
 def effectiveness(attacking_type, defending_type):
-    return type_chart.get(attacking_type, {}).get(defending_type, 1.0)
+    return TYPE_EFF[type_id(attacking_type)][type_id(defending_type)]
 
-base_stats_df = pd.read_csv("basestats.csv")
-base_stats_df.columns = [col.strip().lower().replace(" ", "_") for col in base_stats_df.columns]
-base_stats_df.set_index("name", inplace=True)
-ALL_STATUSES = ['paralyzed', 'burned', 'poisoned', 'confused', 'infatuated', 'asleep', 'frozen', 'turns_volatile', 'toxic_counter']
+ALL_STATUSES = STATUS_KEYS
 
-#choose random set
-def parse_random_ability(possible):
-    if pd.isna(possible):
-        return None
-    options = [a.strip() for a in possible.split("/")]
-    return random.choice(options)
-
-#parse pokemon and random ability
-def build_rental_pool(df, count=6):
-    pool_rows = df.sample(n=count)
-    updated_rows = []
-    for _, row in pool_rows.iterrows():
-        row = row.copy()
-        row["ability"] = parse_random_ability(row["possible_ability"])
-        updated_rows.append(row_to_pokemon(row))
-    return updated_rows
-
-#turns our silly little pokemon into data
-def row_to_pokemon(row):
-    name = row['species']
-    types = row['type'].split() if pd.notna(row['type']) else []
-    moves = [row[f'move_{i}'] for i in range(1, 5)]
-    ev_map = {
-        'hp': 'hp',
-        'atk': 'attack',
-        'def': 'defense',
-        'spa': 'sp._atk',
-        'spd': 'sp._def',
-        'spe': 'speed',
-    }
-    
-    try:
-        base = base_stats_df.loc[name]
-        stats = {
-            'hp': base['hp'],
-            'atk': base['attack'],
-            'def': base['defense'],
-            'spa': base['sp._atk'],
-            'spd': base['sp._def'],
-            'spe': base['speed'],
-        }
-
-        ev_string = str(row.get('ev_spread', '')).lower()
-        ev_stats = [label for label in ev_map if label in ev_string]
-        if ev_stats:
-            ev_per_stat = 510 // len(ev_stats)
-            for stat in ev_stats:
-                stats[stat] += ev_per_stat // 4
-
-    except KeyError:
-        print(f"Could not find base stats for: {name}")
-        stats = {key: 100 for key in ['hp', 'atk', 'def', 'spa', 'spd', 'spe']}
-    
-    item = row['item']
+#how chatty run_battle is, silent never builds a single string
+SILENT, SUMMARY, FULL = 0, 1, 2
 
-    return Pokemon(name, types, moves, stats, item=item, ability=row.get("ability", None))
+#bump whenever a change to the engine changes who wins, anything cached from old results
+#(like saved matchup matrices) is keyed on it and gets rebuilt
+ENGINE_VERSION = 3
 
 ALL_DEFENDING_TYPES = set(type_chart['Fire'].keys())
+DEFENDING_MASK = type_mask(ALL_DEFENDING_TYPES)
+
+#everything score_team needs from one mon, none of it depends on who else is on the team
+class MonFeatures(NamedTuple):
+    base: int           #stat total flag + speed flag
+    types: int          #bitmask of type ids
+    moves: int          #bitmask of move ids
+    coverage: int       #bitmask of ALL_DEFENDING_TYPES we hit super effectively
+    status_bonus: int
+
+@lru_cache(maxsize=4096)
+def mon_features(mon):
+    base = 0
+    #general base stat check
+    if sum(mon.base_stats.values()) >= 500:
+        base += 1
+    #speed is generally favorable, since attacking first is crucial to some pokemon
+    if mon.base_stats['spe'] > 90:
+        base += 1
+
+    status_bonus = sum(score_move(mon, move, 1, 1.0) for move in mon.moves)
+    return MonFeatures(base, mon.type_mask, mon.move_mask, mon.se_mask & DEFENDING_MASK, status_bonus)
+
+def _team_bonus(n_types, n_moves, status_bonus, n_coverage):
+    score = 0
+    if n_types >= 5:
+        score += 1
+    if n_moves >= 8:
+        score += 1
+    score += min(status_bonus // 3, 2)
+    if n_coverage >= 10:
+        score += 2
+    elif n_coverage >= 6:
+        score += 1
+    return score
 
 #chooses a team based off stats
 def score_team(team):
-    total_score = 0
-
-    for mon in team:
-        stat_total = sum(mon.stats.values())
-        #general base stat check
-        if stat_total >= 500:
-            total_score += 1
-        
-        #speed is generally favorable, since attacking first is crucial to some pokemon
-        if mon.stats['spe'] > 90:
-            total_score +=1
-    
-    all_types = set(t for mon in team for t in mon.types)
-    if len(all_types) >= 5:
-        total_score += 1
-    
-    all_moves = set(move for mon in team for move in mon.moves)
-    if len(all_moves) >= 8:
-        total_score += 1
-
-    status_bonus = sum(score_move(mon, move, 1, 1.0) for mon in team for move in mon.moves)
-    total_score += min(status_bonus // 3, 2)
-    
-    coverage = set()
+    base = status = types = moves = coverage = 0
     for mon in team:
-        for move in mon.moves:
-            move_data = move_types.get(move)
-            if not move_data:
-                continue
-            move_type = move_data['type']
-            
-            for defending_type in ALL_DEFENDING_TYPES:
-                if type_chart.get(move_type, {}).get(defending_type, 1.0) == 2.0:
-                    coverage.add(defending_type)
-    
-    if len(coverage) >= 10:
-        total_score += 2
-    elif len(coverage) >= 6:
-        total_score += 1
-    
-    return total_score
+        f = mon_features(mon)
+        base += f.base
+        status += f.status_bonus
+        types |= f.types
+        moves |= f.moves
+        coverage |= f.coverage
+    return base + _team_bonus(types.bit_count(), moves.bit_count(), status, coverage.bit_count())
+
+#best k teams as (score, team), best first. ties keep the order itertools.combinations would find them in.
+#teams get built one mon at a time and a branch is dropped once even the best possible
+#rest of the team can't beat what we already have, so big pools (all 510 sets) stay quick
+def choose_top_teams(pokemon_list, team_size=3, k=5):
+    features = [mon_features(mon) for mon in pokemon_list]
+    n = len(features)
+    if n < team_size:
+        return []
+
+    #best case for whatever gets picked from index j onwards
+    max_base = [0] * (n + 1)
+    max_status = [float('-inf')] * (n + 1)
+    any_types = [0] * (n + 1)
+    any_moves = [0] * (n + 1)
+    any_coverage = [0] * (n + 1)
+    for j in range(n - 1, -1, -1):
+        f = features[j]
+        max_base[j] = max(max_base[j + 1], f.base)
+        max_status[j] = max(max_status[j + 1], f.status_bonus)
+        any_types[j] = any_types[j + 1] | f.types
+        any_moves[j] = any_moves[j + 1] | f.moves
+        any_coverage[j] = any_coverage[j + 1] | f.coverage
+
+    most_types = max(f.types.bit_count() for f in features)
+    most_moves = max(f.moves.bit_count() for f in features)
+
+    top = []        #(score, picked indices), best first
+    picked = []
+
+    def bound(start, left, base, types, moves, status, coverage):
+        return base + left * max_base[start] + _team_bonus(
+            min((types | any_types[start]).bit_count(), types.bit_count() + most_types * left),
+            min((moves | any_moves[start]).bit_count(), moves.bit_count() + most_moves * left),
+            status + left * max_status[start],
+            (coverage | any_coverage[start]).bit_count(),
+        )
+
+    def search(start, base, types, moves, status, coverage):
+        left = team_size - len(picked)
+        if left == 0:
+            score = base + _team_bonus(types.bit_count(), moves.bit_count(), status, coverage.bit_count())
+            if len(top) < k or score > top[-1][0]:
+                #insert after any equal scores so earlier teams win ties
+                pos = len(top)
+                while pos and top[pos - 1][0] < score:
+                    pos -= 1
+                top.insert(pos, (score, tuple(picked)))
+                del top[k:]
+            return
+        for j in range(start, n - left + 1):
+            if len(top) == k and bound(j, left, base, types, moves, status, coverage) <= top[-1][0]:
+                return
+            f = features[j]
+            picked.append(j)
+            search(j + 1, base + f.base, types | f.types, moves | f.moves,
+                   status + f.status_bonus, coverage | f.coverage)
+            picked.pop()
+
+    search(0, 0, 0, 0, 0, 0)
+    return [(score, [pokemon_list[i] for i in idx]) for score, idx in top]
 
 def choose_top_team(pokemon_list, team_size = 3):
-    best_team = None
-    best_score = float('-inf')
-
-    for combo in combinations(pokemon_list, team_size):
-        score = score_team(combo)
-        if score > best_score:
-            best_score = score
-            best_team = combo
-    
-    return list(best_team)
+    return choose_top_teams(pokemon_list, team_size, k=1)[0][1]
 
 #checks move uses
-def score_move(pokemon, move_name, turn_count=1, current_hp=1.0, defender=None, status_effects=None):
-    move_data = move_types.get(move_name, {})
-    effect = move_data.get('effect', '')
+def score_move(pokemon, move, turn_count=1, current_hp=1.0, defender=None):
+    effect = MOVE_ROWS[move][4]
 
-    effect_key = 'infatuated' if effect == 'infatuate' else 'confused'
+    effect_key = 'infatuated' if effect == INFATUATE else 'confused'
     score = 0
 
     # desperate play
-    if current_hp < 0.3 and effect in ['infatuate', 'confuse']:
-        if defender and not status_effects[defender.name][effect_key]:
+    if current_hp < 0.3 and (effect == INFATUATE or effect == CONFUSE):
+        if defender and not getattr(defender, effect_key):
             score += 7
         else:
             score -= 5
 
     #setup moves
-    elif effect == 'heal':
+    elif effect == HEAL:
         if current_hp < 0.4:
             score += 3
         else:
             score -= 2
 
-    elif effect in ['toxic', 'paralyze', 'sleep']:
+    elif effect == TOXIC or effect == PARALYZE or effect == SLEEP:
         if turn_count <= 3:
-            score += 2 if effect != 'sleep' else 3
+            score += 2 if effect != SLEEP else 3
 
-    elif effect == 'infatuate':
-        if defender and not status_effects[defender.name][effect_key]:
+    elif effect == INFATUATE:
+        if defender and not getattr(defender, effect_key):
             score += 2
         else:
             score -= 5
-    elif effect == 'confuse':
-        if defender and not status_effects[defender.name][effect_key]:
+    elif effect == CONFUSE:
+        if defender and not getattr(defender, effect_key):
             score += 2
         else:
             score -= 5
 
 
-    elif effect in ['rain', 'sun']:
-        if 'Water' in pokemon.types and effect == 'rain':
+    elif effect == RAIN or effect == SUN:
+        if 'Water' in pokemon.types and effect == RAIN:
             score += 2
-        elif 'Fire' in pokemon.types and effect == 'sun':
+        elif 'Fire' in pokemon.types and effect == SUN:
             score += 2
 
-    elif effect == 'protect':
+    elif effect == PROTECT:
         score += 2
 
-    elif effect == 'substitute':
+    elif effect == SUBSTITUTE:
         if current_hp > 0.5:
             score += 2
 
@@ -198,33 +206,34 @@ def score_move(pokemon, move_name, turn_count=1, current_hp=1.0, defender=None,
 
 
 #looks at what the move would do
-def choose_best_move(attacker, defender, turn_count=1, current_hp=1.0, status_effects=None):
+def choose_best_move(attacker, defender, turn_count=1, current_hp=1.0, verbose=True):
     best_score = float('-inf')
-    best_move = None
+    best_move = NO_MOVE
 
-    for move in attacker.moves:
-        move_data = move_types.get(move, {})
-        move_type = move_data.get('type', '')
+    for move, move_type_id in zip(attacker.moves, attacker.move_type_ids):
         score = 0
 
         #checks to make sure it actually hits lol
-        if any(effectiveness(move_type, def_type) == 0.0 for def_type in defender.types):
-            print(f"Skipping {move} — no effect on at least one of {defender.name}'s types.")
+        if defender.defense[move_type_id] == 0.0:
+            if verbose:
+                print(f"Skipping {MOVE_NAMES[move]} — no effect on at least one of {defender.name}'s types.")
             continue
 
         #STAB
-        if move_data.get('type') in attacker.types:
+        if move_type_id in attacker.stab_type_ids:
             score += 2
         
         #effectiveness
-        for def_type in defender.types:
-            score += 3 if effectiveness(move_data.get('type', ''), def_type) == 2.0 else 0
+        eff_row = TYPE_EFF[move_type_id]
+        for def_type in defender.type_ids:
+            score += 3 if eff_row[def_type] == 2.0 else 0
         
         #status/setup moves
         hp_ratio = current_hp
-        score += score_move(attacker, move, turn_count, hp_ratio, defender, status_effects)
+        score += score_move(attacker, move, turn_count, hp_ratio, defender)
 
-        print(f"Evaluating {move}: score={score}")
+        if verbose:
+            print(f"Evaluating {MOVE_NAMES[move]}: score={score}")
 
         if score > best_score:
             best_score = score
@@ -232,10 +241,43 @@ def choose_best_move(attacker, defender, turn_count=1, current_hp=1.0, status_ef
         
     return best_move
 
-def should_switch(current, team, opponent, hp):
-    curr_hp = hp[current.name]
-    curr_spe = modify_speed(current, None, ability_lookup.get(current.ability, {}).get("effect", ""))
-    opp_spe = modify_speed(opponent, None, ability_lookup.get(opponent.ability, {}).get("effect", ""))
+#choose_best_move only ever looks at the two sets, whether it's turn 3 or earlier, which side of
+#score_move's hp cutoffs we're on (< 0.3, < 0.4, > 0.5) and the defender's confused/infatuated flags.
+#so the pick is cached on exactly that, and a long run only pays for each distinct context once
+BEST_MOVE_CACHE_SIZE = 1 << 16
+#one hp ratio per bucket that lands on the same side of every cutoff
+_BUCKET_HP = (0.0, 0.3, 0.4, 1.0)
+
+@lru_cache(maxsize=BEST_MOVE_CACHE_SIZE)
+def _cached_best_move(attacker_set, defender_set, early, hp_bucket, confused, infatuated):
+    defender = BattleMon(defender_set)
+    defender.confused, defender.infatuated = confused, infatuated
+    return choose_best_move(BattleMon(attacker_set), defender, 1 if early else 4, _BUCKET_HP[hp_bucket], verbose=False)
+
+#same pick as choose_best_move(..., verbose=False)
+def cached_best_move(attacker, defender, turn_count=1, current_hp=1.0):
+    if current_hp < 0.3:
+        hp_bucket = 0
+    elif current_hp < 0.4:
+        hp_bucket = 1
+    elif current_hp > 0.5:
+        hp_bucket = 3
+    else:
+        hp_bucket = 2
+    return _cached_best_move(attacker.set, defender.set, turn_count <= 3, hp_bucket,
+                             bool(defender.confused), bool(defender.infatuated))
+
+#hits, misses, maxsize, currsize
+def best_move_cache_info():
+    return _cached_best_move.cache_info()
+
+def best_move_cache_clear():
+    _cached_best_move.cache_clear()
+
+def should_switch(current, team, opponent):
+    curr_hp = current.hp
+    curr_spe = modify_speed(current, None, current.ability_effect)
+    opp_spe = modify_speed(opponent, None, opponent.ability_effect)
 
     # if faster, get that last hit
     if curr_hp < 30 and curr_spe >= opp_spe:
@@ -243,12 +285,10 @@ def should_switch(current, team, opponent, hp):
 
     # guess incoming move danger
     highest_threat = 0
-    for move in opponent.moves:
-        move_data = move_types.get(move, {})
-        move_type = move_data.get("type", "")
-        move_power = move_data.get("power", 0)
-        if any(effectiveness(move_type, t) > 1.0 for t in current.types):
-            highest_threat += move_power
+    for move, move_type_id in zip(opponent.moves, opponent.move_type_ids):
+        eff_row = TYPE_EFF[move_type_id]
+        if any(eff_row[t] > 1.0 for t in current.type_ids):
+            highest_threat += MOVE_ROWS[move][1]
 
     # if they're a big threat, just dont switch
     if highest_threat >= curr_hp:
@@ -256,427 +296,517 @@ def should_switch(current, team, opponent, hp):
 
     # who would be better???
     for candidate in team:
-        if candidate.name == current.name or hp[candidate.name] <= 0:
+        if candidate is current or candidate.hp <= 0:
             continue
-        for move in opponent.moves:
-            m = move_types.get(move, {})
-            move_type = m.get("type", "")
-            if any(effectiveness(move_type, t) < 1.0 for t in candidate.types):
+        for move_type_id in opponent.move_type_ids:
+            eff_row = TYPE_EFF[move_type_id]
+            if any(eff_row[t] < 1.0 for t in candidate.type_ids):
                 return candidate
     
     return None
 
 
+#status moves and what they do, message only gets formatted when someone is listening
+EFFECT_SPEECH = {
+    INFATUATE: ('infatuated', "{attacker} used {move}. {defender} is in love!"),
+    CONFUSE: ('confused', "{attacker} used {move}. {defender} is confused!"),
+    PARALYZE: ('paralyzed', "{attacker} used {move}. {defender} is paralyzed! It may be unable to move!"),
+    BURN: ('burned', "{attacker} used {move}. {defender} was burned!"),
+    TOXIC: (('poisoned', 'toxic_counter'), "{attacker} used {move}. {defender} is badly poisoned!"),
+}
+THUNDER = MOVES.ids['Thunder']
+WATER, FIRE = TYPE_IDS['Water'], TYPE_IDS['Fire']
+
 #Battle Test
-def run_battle(player_team, enemy_team):
-    p1_active = player_team[0]
-    p2_active = enemy_team[0]
-    print(f"Battle Start: {p1_active.name} vs. {p2_active.name}!\n")
-
-    hp = {mon.name: 100 for mon in player_team + enemy_team}
-    MAX_TURNS = 50
-    turn = 1
-
-    active_turns = {p1_active.name: 0, p2_active.name: 0}
-
-    item_used = {p1_active.name: False, p2_active.name: False}
-    status_effects = {
-        p1_active.name : {'infatuated': False, 
-                   'confused': False, 
-                   'turns_volatile': 0,
-                   'paralyzed': False,
-                   'asleep': 0,
-                   'frozen' : 0,
-                   'burned': False,
-                   'poisoned': False,
-                   'toxic_counter': 0,
-                   },
-        p2_active.name : {'infatuated': False, 
-                   'confused': False, 
-                   'turns_volatile': 0,
-                   'paralyzed': False,
-                   'asleep': 0,
-                   'frozen' : 0,
-                   'burned': False,
-                   'poisoned': False,
-                   'toxic_counter': 0,
-                   },
-    }
-    weather = {'type': None, 'turns': 0}
-    def ensure_mon_initialized(mon):
-        if mon.name not in status_effects:
-            status_effects[mon.name] = {
-                k: (0 if 'down' in k or k in ['asleep', 'toxic_counter', 'turns_volatile'] else False)
-                for k in ALL_STATUSES
-            }
-        if mon.name not in item_used:
-            item_used[mon.name] = False
-        if mon.name not in active_turns:
-            active_turns[mon.name] = 0
-
-    #basically intimidate check
+MAX_TURNS = 50
+
+#start of battle abilities (basically intimidate check)
+def start_battle(state, verbosity=SILENT):
+    full = verbosity >= FULL
+    p1_active = state.active_mon(PLAYER)
+    p2_active = state.active_mon(ENEMY)
     for source, target in [(p1_active, p2_active), (p2_active, p1_active)]:
-        effect = ability_lookup.get(source.ability, {}).get('effect', '')
-        if effect.startswith('on_entry_lower:'):
-            stat = effect.split(":")[1]
-            lowered = on_entry_lower_stat(effect, stat, target.stats)
+        ability = source.ability_effect
+        if ability.kind == ON_ENTRY_LOWER:
+            stat = ability.param
+            #clones share stats, so take our own copy before changing them
+            target.own_stats()
+            lowered = on_entry_lower_stat(ability, stat, target.stats)
             if lowered:
-                print(f"{source.name}'s {source.ability} lowered {target.name}'s {stat}!")
+                target.stages[stat] -= 1
+                if full:
+                    print(f"{source.name}'s {source.ability} lowered {target.name}'s {stat}!")
 
-    #speed check
-    while hp[p1_active.name] > 0 and hp[p2_active.name] > 0 and turn <= MAX_TURNS:
+#who won a battle that's over, by whose side still has something standing
+def battle_winner(state):
+    if state.alive(PLAYER):
+        return "player"
+    if state.alive(ENEMY):
+        return "enemy"
+    return "draw"
+
+#plays one whole turn of state: switches, both moves, end of turn, then moves state.turn on.
+#same arguments as run_battle, switch=False starts after the switching phase
+def play_turn(state, rng=random, policies=(None, None), verbosity=SILENT, events=None, profiler=None, switch=True):
+    turn = state.turn
+    prof = profiler is not None
+    full = verbosity >= FULL
+    player_team, enemy_team = state.teams
+    p1_active = state.active_mon(PLAYER)
+    p2_active = state.active_mon(ENEMY)
+    if prof:
+        profiler.enter(SWITCHING)
+    if full:
         print(f"Turn {turn}")
 
-        p1_active_spe = modify_speed(p1_active, weather['type'], ability_lookup.get(p1_active.ability, {}).get("effect", ""))
-        p2_active_spe = modify_speed(p2_active, weather['type'], ability_lookup.get(p2_active.ability, {}).get("effect", ""))
-        # Switching phase
-        p1_switch = should_switch(p1_active, player_team, p2_active, hp)
+    # Switching phase (skipped when picking up a turn whose switches already happened)
+    if switch:
+        p1_switch = should_switch(p1_active, player_team, p2_active)
         if p1_switch:
-            print(f"{p1_active.name} switches out! {p1_switch.name} is sent in!")
+            if full:
+                print(f"{p1_active.name} switches out! {p1_switch.name} is sent in!")
+            if events:
+                events(SwitchEvent(turn, p1_active.name, p1_switch.name))
             p1_active = p1_switch
+            state.send_out(p1_active)
 
-        p2_switch = should_switch(p2_active, enemy_team, p1_active, hp)
+        p2_switch = should_switch(p2_active, enemy_team, p1_active)
         if p2_switch:
-            print(f"{p2_active.name} switches out! {p2_switch.name} is sent in!")
+            if full:
+                print(f"{p2_active.name} switches out! {p2_switch.name} is sent in!")
+            if events:
+                events(SwitchEvent(turn, p2_active.name, p2_switch.name))
             p2_active = p2_switch
-        
-        ensure_mon_initialized(p1_active)
-        ensure_mon_initialized(p2_active)
-        # calculate speed and turn order AFTER switching
-        p1_active_spe = modify_speed(p1_active, weather['type'], ability_lookup.get(p1_active.ability, {}).get("effect", ""))
-        p2_active_spe = modify_speed(p2_active, weather['type'], ability_lookup.get(p2_active.ability, {}).get("effect", ""))
-        if p1_active_spe > p2_active_spe:
-            first, second = p1_active, p2_active
-        else:
-            first, second = p2_active, p1_active
-
-        #each AI chooses a move
-        first_move = choose_best_move(first, second, turn, hp[first.name] / 100, status_effects)
-        second_move = choose_best_move(second, first, turn, hp[second.name] / 100, status_effects)
-
-        #calculates attacks
-        for attacker, defender, move in [(first, second, first_move), (second, first, second_move)]:
-            active_turns[attacker.name] += 1
-            if hp[defender.name] <= 0:
-                continue #if they're fainted its over
-
-            effects = status_effects[attacker.name]
-            #confusion/infatuation check
-            if effects['infatuated'] or effects['confused']:
-                if random.random() < 0.3:
+            state.send_out(p2_active)
+
+    # calculate speed and turn order AFTER switching
+    if prof:
+        profiler.enter(TURN_ORDER)
+    p1_active_spe = modify_speed(p1_active, state.weather, p1_active.ability_effect)
+    p2_active_spe = modify_speed(p2_active, state.weather, p2_active.ability_effect)
+    if p1_active_spe > p2_active_spe:
+        first, second = p1_active, p2_active
+    else:
+        first, second = p2_active, p1_active
+
+    #each AI chooses a move
+    if prof:
+        profiler.enter(MOVE_CHOICE)
+    #the full printout needs every move scored, otherwise the cached pick is the same move
+    policy = policies[first.side]
+    if policy:
+        first_move = policy(first, second, state)
+    elif full:
+        first_move = choose_best_move(first, second, turn, first.hp / 100, verbose=True)
+    else:
+        first_move = cached_best_move(first, second, turn, first.hp / 100)
+    policy = policies[second.side]
+    if policy:
+        second_move = policy(second, first, state)
+    elif full:
+        second_move = choose_best_move(second, first, turn, second.hp / 100, verbose=True)
+    else:
+        second_move = cached_best_move(second, first, turn, second.hp / 100)
+
+    #calculates attacks
+    for attacker, defender, move in [(first, second, first_move), (second, first, second_move)]:
+        if prof:
+            profiler.enter(STATUS_CHECKS)
+        attacker.active_turns += 1
+        if defender.hp <= 0:
+            continue #if they're fainted its over
+
+        #confusion/infatuation check
+        if attacker.infatuated or attacker.confused:
+            if rng.random() < 0.3:
+                if full:
                     print(f"Checking if {attacker.name} passes check to snap out of it")
-                    effects['infatuated'] = False
-                    effects['confused'] = False
-                    effects['turns_volatile'] = 0
+                attacker.infatuated = False
+                attacker.confused = False
+                attacker.turns_volatile = 0
+                if full:
                     print(f"{attacker.name} snapped out of it!")
-                else:
+            else:
+                if full:
                     print(f"Checking if {attacker.name} passes check to attack")
-                    if random.random() < 0.5:
+                if rng.random() < 0.5:
+                    if full:
                         print(f"{attacker.name} is too lost to move!")
-                        effects['turns_volatile'] += 1
-                        continue
+                    attacker.turns_volatile += 1
+                    continue
 
-            # move hindering status checks
-            if effects['paralyzed']:
-                if random.random() <= 0.25:
+        # move hindering status checks
+        if attacker.paralyzed:
+            if rng.random() <= 0.25:
+                if full:
                     print(f"{attacker.name} is fully paralyzed!")
-                    continue
-            if effects['asleep'] > 0:
-                print(f"{attacker.name} is fast asleep!")
-                effects['asleep'] -= 1
                 continue
-            if effects['frozen'] > 0:
+        if attacker.asleep > 0:
+            if full:
+                print(f"{attacker.name} is fast asleep!")
+            attacker.asleep -= 1
+            continue
+        if attacker.frozen > 0:
+            if full:
                 print(f"{attacker.name} is frozen!")
-                effects['frozen'] -= 1
-                continue
+            attacker.frozen -= 1
+            continue
 
-            #basically sitrus berry check
-            item = item_effects.get(attacker.item, {})
-            if (
-                not item_used[attacker.name]
-                and item.get('trigger') == 'low_hp'
-                and hp[attacker.name] <= 100 * item['threshold']
-            ):
-                if item['effect'] == 'heal_flat':
-                    hp[attacker.name] = min(100, hp[attacker.name] + item['value'])
-                    item_used[attacker.name] = True
-                    print(f"{attacker.name} restored health using its {attacker.item}!")
-
-            
-            move_data = move_types.get(move, {})
-            move_type = move_data.get('type', '')
-            power = move_data.get('power', 0) #0 if no damage
-
-            #check accuracy
-            if move == "Thunder" and weather['type'] == 'Rain':
-                accuracy = 100
-            accuracy = move_data.get('accuracy', 100) #100 by default since most are 100
-            if random.randint(1, 100) > accuracy:
-                print(f"{attacker.name} used {move}... but it missed!")
-                continue
+        attacker_items = attacker.item_hooks
+        defender_items = defender.item_hooks
 
+        #basically sitrus berry check
+        hook = attacker_items.low_hp
+        if hook and not attacker.item_used and attacker.hp <= hook.threshold_hp:
+            if prof:
+                profiler.enter(ITEMS)
+            attacker.hp = min(100, attacker.hp + hook.heal)
+            attacker.item_used = True
+            if full:
+                print(f"{attacker.name} restored health using its {attacker.item}!")
 
-            #check if move can give effects
-            effectspeech = {
-                'infatuate': ('infatuated', f"{attacker.name} used {move}. {defender.name} is in love!"),
-                'confuse': ('confused', f"{attacker.name} used {move}. {defender.name} is confused!"),
-                'paralyze': ('paralyzed', f"{attacker.name} used {move}. {defender.name} is paralyzed! It may be unable to move!"),
-                'burn': ('burned', f"{attacker.name} used {move}. {defender.name} was burned!"),
-                'toxic': (('poisoned', 'toxic_counter'), f"{attacker.name} used {move}. {defender.name} is badly poisoned!"),
-            }
-            effect = move_data.get('effect')
-            if effect in effectspeech:
-                keys, message = effectspeech[effect]
-                if isinstance(keys, tuple): 
-                    status_effects[defender.name][keys[0]] = True
-                    status_effects[defender.name][keys[1]] = 1
-                else:
-                    status_effects[defender.name][keys] = True
-                print(message)
-
-            #cure items
-            item = item_effects.get(defender.item, {})
-
-            if not item_used[defender.name] and item.get('trigger') == 'status':
-                effect = item.get('effect')
-                status_to_cure = item.get('status')
-                #cureall (lum)
-                if effect == "cure_all_status":
-                    for k in ALL_STATUSES:
-                        status_effects[defender.name][k] = False if isinstance(status_effects[defender.name][k], bool) else 0
-                    item_used[defender.name] = True
+        
+        #power is 0 if no damage, accuracy 100 by default since most are 100
+        if prof:
+            profiler.enter(DAMAGE)
+        move_type_id, power, accuracy, category, effect, status_code, chance = MOVE_ROWS[move]
+
+        #check accuracy
+        if move == THUNDER and state.weather == 'Rain':
+            accuracy = 100
+        if rng.randint(1, 100) > accuracy:
+            if full:
+                print(f"{attacker.name} used {MOVE_NAMES[move]}... but it missed!")
+            if events:
+                events(MissEvent(turn, attacker.name, MOVE_NAMES[move]))
+            continue
+
+
+        #check if move can give effects
+        if effect in EFFECT_SPEECH:
+            if prof:
+                profiler.enter(STATUS_CHECKS)
+            keys, message = EFFECT_SPEECH[effect]
+            if isinstance(keys, tuple): 
+                setattr(defender, keys[0], True)
+                setattr(defender, keys[1], 1)
+            else:
+                setattr(defender, keys, True)
+            if full:
+                print(message.format(attacker=attacker.name, move=MOVE_NAMES[move], defender=defender.name))
+            if events:
+                events(StatusEvent(turn, defender.name, keys[0] if isinstance(keys, tuple) else keys))
+
+        #cure items
+        hook = defender_items.status
+        if hook and not defender.item_used:
+            if prof:
+                profiler.enter(ITEMS)
+            status_to_cure = hook.status
+            #cureall (lum)
+            if status_to_cure is None:
+                defender.clear_status()
+                defender.item_used = True
+                if full:
                     print(f"{defender.name}'s {defender.item} cured all status conditions!")
-                #cure some (pecha, rawst, etc)
-                elif status_to_cure and status_effects[defender.name].get(status_to_cure):
-                    if isinstance(status_effects[defender.name][status_to_cure], bool):
-                        status_effects[defender.name][status_to_cure] = False
-                    else:
-                        status_effects[defender.name][status_to_cure] = 0
-                    item_used[defender.name] = True
+            #cure some (pecha, rawst, etc)
+            elif status_to_cure in ALL_STATUSES and getattr(defender, status_to_cure):
+                setattr(defender, status_to_cure, 0 if status_to_cure in COUNTER_STATUSES else False)
+                defender.item_used = True
+                if full:
                     print(f"{defender.name}'s {defender.item} cured its {status_to_cure}!")
-            
-            #checks if its a status
-            if move_data.get('category') == 'Status' or power == 0:
-                print(f"{attacker.name} used {move} — no damage dealt (status move or non-damaging).")
-                continue
-            #weather
-            if move_data.get('effect') == 'rain':
-                weather['type'] = 'Rain'
-                weather['turns'] = 5
+        
+        #checks if its a status
+        if prof:
+            profiler.enter(DAMAGE)
+        if category == STATUS or power == 0:
+            if full:
+                print(f"{attacker.name} used {MOVE_NAMES[move]} — no damage dealt (status move or non-damaging).")
+            continue
+        #weather
+        if effect == RAIN:
+            state.weather = 'Rain'
+            state.weather_turns = 5
+            if full:
                 print('It started to rain!')
-            elif move_data.get('effect') == 'sun':
-                weather['type'] = 'Sun'
-                weather['turns'] = 5
+        elif effect == SUN:
+            state.weather = 'Sun'
+            state.weather_turns = 5
+            if full:
                 print('The sunlight turned harsh!')
-            #P/S split
-            if move_data.get('category') == 'Special':
-                atk = attacker.stats['spa']
-                defense = defender.stats['spd']
-            else:
-                atk = attacker.stats['atk']
-                defense = defender.stats['def']
-            atk = modify_attack(attacker, ability_lookup.get(attacker.ability, {}).get("effect", ""), status_effects)
-            eff = 1.0
-            for t in defender.types:
-                eff *= effectiveness(move_type, t)
-            
-            defender_effect = ability_lookup.get(defender.ability, {}).get('effect', '')
-            if check_immunity(defender_effect, move_type):
-                print(f"{attacker.name} used {move}... but {defender.name}'s {defender.ability} made it immune!")
-                continue
-            if eff == 0.0:
-                print(f"{attacker.name} used {move}... but it had no effect!")
-                continue
+        #P/S split
+        if category == SPECIAL:
+            atk = attacker.stats['spa']
+            defense = defender.stats['spd']
+        else:
+            atk = attacker.stats['atk']
+            defense = defender.stats['def']
+        atk = modify_attack(attacker, attacker.ability_effect)
+        eff = defender.defense[move_type_id]
+        
+        if check_immunity(defender.ability_effect, move_type_id):
+            if full:
+                print(f"{attacker.name} used {MOVE_NAMES[move]}... but {defender.name}'s {defender.ability} made it immune!")
+            continue
+        if eff == 0.0:
+            if full:
+                print(f"{attacker.name} used {MOVE_NAMES[move]}... but it had no effect!")
+            continue
 
-            #attack boosters (Nevermeltice, metal coat, etc.)
-            if attacker.item in item_effects:
-                item = item_effects[attacker.item]
-                if item['trigger'] == 'on_move' and item.get('type') == move_type:
-                    power = max(1, power)
-                    power = int(power * item['multiplier'])
-                    print(f"{attacker.name}'s {attacker.item} boosted its {move_type} move!")
-            #weather boosts
-            if weather['type'] == 'Rain':
-                if move_type == 'Water':
-                    power = int(power * 1.5)
-                elif move_type == 'Fire':
-                    power = int(power * 0.5)
-            elif weather['type'] == 'Sun':
-                if move_type == 'Fire':
-                    power = int(power * 1.5)
-                elif move_type == 'Water':
-                    power = int(power * 0.5)
-            #crits
-            crit_chance = 6.25
-            if attacker.item == "Scope Lens":
-                crit_chance = 12.5
-            
-            if random.uniform(0, 100) < crit_chance:
-                power = int(power * 2)
+        #attack boosters (Nevermeltice, metal coat, etc.)
+        on_move = attacker_items.on_move
+        if on_move and on_move.boost_type_id == move_type_id:
+            if prof:
+                profiler.enter(ITEMS)
+            power = max(1, power)
+            power = int(power * on_move.multiplier)
+            if full:
+                print(f"{attacker.name}'s {attacker.item} boosted its {TYPES[move_type_id]} move!")
+            if prof:
+                profiler.enter(DAMAGE)
+        #weather boosts
+        if state.weather == 'Rain':
+            if move_type_id == WATER:
+                power = int(power * 1.5)
+            elif move_type_id == FIRE:
+                power = int(power * 0.5)
+        elif state.weather == 'Sun':
+            if move_type_id == FIRE:
+                power = int(power * 1.5)
+            elif move_type_id == WATER:
+                power = int(power * 0.5)
+        #crits (scope lens ups the chance)
+        crit_chance = on_move.crit_chance if on_move else 6.25
+
+        if rng.uniform(0, 100) < crit_chance:
+            power = int(power * 2)
+            if full:
                 print("A Critical Hit!")
-            
-            #gen 3 formula (heavily simplified)
-            power = int(power * boost_type_if_lowhp(attacker, move_type, ability_lookup.get(attacker.ability, {}).get("effect", ""), hp[attacker.name] / 100))
-            modifier = eff * random.uniform(0.85, 1.0)
-            damage = int((((2 * 50 / 5 + 2) * power * atk / defense) / 50 + 2) * modifier)
-
-            #check healing abilities
-            attacker_effect = ability_lookup.get(defender.ability, {}).get("effect", "")
-            if should_heal_on_hit(attacker_effect, move_type):
-                heal_amt = int(100 * 0.25)
-                hp[defender.name] = min(100, hp[defender.name] + heal_amt)
-                print(f"{defender.name} absorbed the {move_type}-type move and healed!")
-                continue
-            hp[defender.name] -= damage
-            hp[defender.name] = max(0, hp[defender.name])
-
-            #status infliction check
-            status = move_data.get('status')
-            chance = move_data.get('status_chance', 0)
-
-            if status and random.randint(1, 100) <= chance:
-                if not status_effects[defender.name].get(status):
-                    if isinstance(status_effects[defender.name][status], bool):
-                        status_effects[defender.name][status] = True
-                    else:
-                        status_effects[defender.name][status] = 1
+        
+        #gen 3 formula (heavily simplified), damage.py has the same steps for the AI to look at
+        power = int(power * boost_type_if_lowhp(attacker, move_type_id, attacker.ability_effect, attacker.hp / 100))
+        #one of the 16 rolls in damage.ROLLS
+        modifier = eff * (rng.randint(85, 100) / 100)
+        damage = hit_damage(power, atk, defense, modifier)
+
+        #check healing abilities
+        if should_heal_on_hit(defender.ability_effect, move_type_id):
+            heal_amt = int(100 * 0.25)
+            defender.hp = min(100, defender.hp + heal_amt)
+            if full:
+                print(f"{defender.name} absorbed the {TYPES[move_type_id]}-type move and healed!")
+            continue
+        defender.hp -= damage
+        defender.hp = max(0, defender.hp)
+
+        #status infliction check
+        if prof:
+            profiler.enter(STATUS_CHECKS)
+        status = STATUSES[status_code]
+
+        #only statuses we actually track (ice beam's 'freeze' used to crash here)
+        if status in ALL_STATUSES and rng.randint(1, 100) <= chance:
+            if not getattr(defender, status):
+                setattr(defender, status, 1 if status in COUNTER_STATUSES else True)
+                if full:
                     print(f"{defender.name} was affected by {status}!")
-
-            #annoying (xD) effectiveness flavor text
-            print(f"{attacker.name} used {move}! It's {'super effective' if eff > 1 else 'not very effective' if eff < 1 else 'effective'}! {defender.name} took {damage} damage. (HP: {hp[defender.name]}/100)")
-            
-            #contact ability check
-            contact_effect = ability_lookup.get(defender.ability, {}).get("effect", "")
-            result = apply_contact_ability(defender, attacker, contact_effect, status_effects)
-            if result:
+                if events:
+                    events(StatusEvent(turn, defender.name, status))
+
+        #annoying (xD) effectiveness flavor text
+        if full:
+            print(f"{attacker.name} used {MOVE_NAMES[move]}! It's {'super effective' if eff > 1 else 'not very effective' if eff < 1 else 'effective'}! {defender.name} took {damage} damage. (HP: {defender.hp}/100)")
+        if events:
+            events(MoveEvent(turn, attacker.name, MOVE_NAMES[move], damage, defender.hp))
+        
+        #contact ability check
+        result = apply_contact_ability(defender, attacker, defender.ability_effect, rng)
+        if result:
+            if full:
                 print(f"{attacker.name} was {result} due to contact with {defender.name}!")
-            
-            #also annoying shell bell check
-            if attacker.item == 'Shell Bell' and damage > 0:
-                heal = max(1, int(damage * item_effects['Shell Bell']['multiplier']))
-                hp[attacker.name] = min(100, hp[attacker.name] + heal)
+            if events:
+                events(StatusEvent(turn, attacker.name, result))
+        
+        #also annoying shell bell check
+        hook = attacker_items.on_damage_dealt
+        if hook and damage > 0:
+            if prof:
+                profiler.enter(ITEMS)
+            heal = max(1, int(damage * hook.fraction))
+            attacker.hp = min(100, attacker.hp + heal)
+            if full:
                 print(f"{attacker.name} regained HP with its Shell Bell!")
-            
-            #Focus band check
-            if defender.item == "Focus Band" and damage >= hp[defender.name]:
-                if random.random() < item_effects['Focus Band']['chance']:
-                    damage = hp[defender.name] - 1
+        
+        #Focus band check
+        hook = defender_items.fatal_hit
+        if hook and damage >= defender.hp:
+            if prof:
+                profiler.enter(ITEMS)
+            if rng.random() < hook.chance:
+                damage = defender.hp - 1
+                if full:
                     print(f"{defender.name} held on with its Focus Band!")
-            
+        
 
-            #damaging status effect checks
-            if effects['burned']:
-                burn_damage = max(1, hp[attacker.name] // 8)
+        #damaging status effect checks
+        if prof:
+            profiler.enter(END_OF_TURN)
+        if attacker.burned:
+            burn_damage = max(1, attacker.hp // 8)
+            if full:
                 print(f"{attacker.name} is hurt by it's burn!")
-                hp[attacker.name] -= burn_damage
-            
-            if effects['poisoned']:
-                if effects['toxic_counter'] > 0:
+            attacker.hp -= burn_damage
+        
+        if attacker.poisoned:
+            if attacker.toxic_counter > 0:
+                if full:
                     print(f"{attacker.name} is badly poisoned!")
-                    toxic_damage = max(1, hp[attacker.name] * effects['toxic_counter'] // 16)
-                    hp[attacker.name] -= toxic_damage
-                    effects['toxic_counter'] += 1
-                else:
+                toxic_damage = max(1, attacker.hp * attacker.toxic_counter // 16)
+                attacker.hp -= toxic_damage
+                attacker.toxic_counter += 1
+            else:
+                if full:
                     print(f"{attacker.name} is hurt by poison!")
-                    poison_damage = max(1, hp[attacker.name] // 8)
-                    hp[attacker.name] -= poison_damage
-            #weather tick
-            if weather['type']:
-                weather['turns'] -= 1
-                if weather['turns'] == 0:
-                    print(f"The {weather['type']} faded.")
-                    weather['type'] = None
-                else:
-                    print(f"The {weather['type']} continues...")
-
-            #check if they've fainted
-            if hp[defender.name] == 0:
+                poison_damage = max(1, attacker.hp // 8)
+                attacker.hp -= poison_damage
+        #weather tick
+        if state.weather:
+            state.weather_turns -= 1
+            if state.weather_turns == 0:
+                if full:
+                    print(f"The {state.weather} faded.")
+                state.weather = None
+            else:
+                if full:
+                    print(f"The {state.weather} continues...")
+
+        #check if they've fainted
+        if defender.hp == 0:
+            if prof:
+                profiler.enter(FAINT)
+            if full:
                 print(f"{defender.name} fainted!\n")
+            if events:
+                events(FaintEvent(turn, defender.name))
 
-                #check if they have more mons
-                team = player_team if defender.name in [m.name for m in player_team] else enemy_team
-                available = [mon for mon in team if hp[mon.name] > 0]
+            #check if they have more mons
+            next_mon = state.next_available(defender.side)
 
-                if available:
-                    next_mon = available[0]
+            if next_mon:
+                if full:
                     print(f"{defender.name}'s trainer sends out {next_mon.name}!")
-                    if defender == p1_active:
-                        p1_active = next_mon
-                    else:
-                        p2_active = next_mon
-
-                    #initialize everything
-                    ensure_mon_initialized(p1_active)
-                    ensure_mon_initialized(p2_active)
-
-                    break  # continue w next mon
+                if events:
+                    events(SwitchEvent(turn, defender.name, next_mon.name))
+                state.send_out(next_mon)
+                if defender.side == PLAYER:
+                    p1_active = next_mon
                 else:
-                    break  # u lost bro...
-
-            #leftovers & other after turn items
-            for mon in [p1_active,p2_active]:
-                item = item_effects.get(mon.item, {})
-                if item.get('trigger') == 'end_turn' and item['effect'] == 'heal_percent':
-                    heal = max(1, int(hp[mon.name] * (item['value'] / 100)))
-                    hp[mon.name] = min(100, hp[mon.name] + heal)
-                    print(f"{mon.name} restored a little HP using its {mon.item}!")
-                turn += 1
-                if turn > MAX_TURNS:
-                    print("The battle lasted too long and ended in a draw!")
-                    break
-
-    if any(hp[mon.name] > 0 for mon in player_team):
-        print(f"{p1_active.name} wins the battle!")
-    elif any(hp[mon.name] > 0 for mon in enemy_team):
-        print(f"{p2_active.name} wins the battle!")
-    else:
-        print("Both teams fainted! It's a draw!")
-
-    if any(hp[mon.name] > 0 for mon in player_team):
-        return "player"
-    elif any(hp[mon.name] > 0 for mon in enemy_team):
-        return "enemy"
-    else:
-        return "draw"
-
-if __name__ == "__main__":
-    df = pd.read_csv("L50R1P.csv")
-    df.columns = [col.strip().lower().replace(" ", "_") for col in df.columns]
-    all_pokemon_list = [row_to_pokemon(row) for _, row in df.iterrows()]
-    rental_pool_player = build_rental_pool(df)
-    rental_pool_enemy = build_rental_pool(df)
-
-    player_team = choose_top_team(rental_pool_player)
-    enemy_team = choose_top_team(rental_pool_enemy)
-
-    # Currently run_battle only supports 1v1; this runs the lead matchup
-    # run_battle(player_team, enemy_team)
-
-results = {"player": 0, "enemy": 0, "draw": 0}
-results_log = []
-for i in range(500):  # try 100 to start, scale up later
-    player_team = random.sample(all_pokemon_list, 3)
-    enemy_team = random.sample(all_pokemon_list, 3)
-    winner = run_battle(player_team, enemy_team)
-    results[winner] += 1
-    results_log.append(winner)
-    print(f"Game {i+1}: {winner}")
-
-
-labels = results.keys()
-values = results.values()
+                    p2_active = next_mon
 
-plt.bar(labels, values, color=['green', 'red', 'gray'])
-plt.title("AI Battle Outcomes (3v3)")
-plt.xlabel("Winner")
-plt.ylabel("Number of Wins")
-plt.show()
-
-with open("battle_logs.csv", "w", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow(["Match", "Winner"])
-    for i, result in enumerate(results_log):
-        writer.writerow([i+1, result])
+                break  # continue w next mon
+            else:
+                break  # u lost bro...
+
+    #leftovers & other after turn items
+    if prof:
+        profiler.enter(END_OF_TURN)
+    for mon in [p1_active,p2_active]:
+        hook = mon.item_hooks.end_turn
+        if hook and mon.hp > 0:
+            heal = max(1, int(mon.hp * (hook.percent / 100)))
+            mon.hp = min(100, mon.hp + heal)
+            if full:
+                print(f"{mon.name} restored a little HP using its {mon.item}!")
+    state.turn += 1
+
+#every random draw goes through rng (anything with random/randint/uniform, like a random.Random).
+#left out it's the random module itself, so random.seed() still works for quick scripts.
+#profiler (a profiler.PhaseProfiler) gets told each time the battle moves on to another phase.
+#policies is (player policy, enemy policy), each one a policy(attacker, defender, state) -> move id
+#that picks moves instead of choose_best_move. None on either side keeps the greedy AI
+def run_battle(player_team, enemy_team, verbosity=FULL, events=None, rng=None, profiler=None, policies=None):
+    if rng is None:
+        rng = random
+    policies = policies or (None, None)
+    prof = profiler is not None
+    if prof:
+        profiler.start_battle()
+    summary = verbosity >= SUMMARY
+    #fresh per-battle state, the sets themselves never get touched
+    state = BattleState(player_team, enemy_team)
+    if summary:
+        print(f"Battle Start: {state.active_mon(PLAYER).name} vs. {state.active_mon(ENEMY).name}!\n")
+    start_battle(state, verbosity)
 
+    #speed check
+    while state.active_mon(PLAYER).hp > 0 and state.active_mon(ENEMY).hp > 0:
+        play_turn(state, rng, policies, verbosity, events, profiler)
+        if state.turn > MAX_TURNS:
+            if summary:
+                print("The battle lasted too long and ended in a draw!")
+            if events:
+                events(BattleEndEvent(state.turn, "draw"))
+            if prof:
+                profiler.end_battle()
+            return "draw"
+
+    winner = battle_winner(state)
+    if summary:
+        if winner == "player":
+            print(f"{state.active_mon(PLAYER).name} wins the battle!")
+        elif winner == "enemy":
+            print(f"{state.active_mon(ENEMY).name} wins the battle!")
+        else:
+            print("Both teams fainted! It's a draw!")
+
+    if events:
+        events(BattleEndEvent(state.turn, winner))
+    if prof:
+        profiler.end_battle()
+    return winner
+
+def plot_results(results):
+    import matplotlib.pyplot as plt
+    labels = results.keys()
+    values = results.values()
+
+    plt.bar(labels, values, color=['green', 'red', 'gray'])
+    plt.title("AI Battle Outcomes (3v3)")
+    plt.xlabel("Winner")
+    plt.ylabel("Number of Wins")
+    plt.show()
+
+def write_battle_log(results_log, path="battle_logs.csv"):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Match", "Winner"])
+        for i, result in enumerate(results_log):
+            writer.writerow([i+1, result])
 
-    
+if __name__ == "__main__":
+    import argparse
+    from tournament import run_tournament
+
+    parser = argparse.ArgumentParser(description="Run a batch of AI vs AI battle factory games.")
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="master seed, same seed = same results")
+    parser.add_argument("--no-plot", action="store_true")
+    parser.add_argument("--replay", type=int, default=None, metavar="INDEX",
+                        help="replay one game of the --seed run with full output and its random draws")
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        from tournament import replay_game
+        winner, draws = replay_game(args.replay, seed=args.seed)
+        print(f"\nwinner: {winner}, {len(draws)} random draws")
+        for method, draw_args, result in draws:
+            print(f"  {method}{draw_args}: {result}")
+        raise SystemExit
+
+    results, results_log = run_tournament(args.games, workers=args.workers, seed=args.seed)
+    print(results)
+
+    if not args.no_plot:
+        plot_results(results)
+    write_battle_log(results_log)
@@ -0,0 +1,211 @@
+from time import perf_counter
+
+from ability_effects import modify_speed
+from battle_state import PLAYER
+from damage import damage_distribution
+from script import cached_best_move
+
+#knocking the other mon out is worth this much on top of the hp swing
+KO_BONUS = 0.5
+
+class _OutOfTime(Exception):
+    pass
+
+#what one hit can do to a target at hp, boiled down to at most 4 outcomes: miss, ko, and the
+#average non-ko damage with and without a crit. chances add to 1, damages are ints so hp stays an int
+def _outcomes(dist, hp):
+    outcomes = []
+    ko = 0.0
+    for rolls, chance in ((dist.normal, (1 - dist.crit_chance) * dist.accuracy),
+                          (dist.crit, dist.crit_chance * dist.accuracy)):
+        if not chance:
+            continue
+        survived = [d for d in rolls if d < hp]
+        ko += chance * (16 - len(survived)) / 16
+        if survived:
+            outcomes.append((chance * len(survived) / 16, round(sum(survived) / len(survived))))
+    if ko:
+        outcomes.append((ko, hp))
+    if dist.accuracy < 1:
+        outcomes.append((1 - dist.accuracy, 0))
+    return outcomes
+
+#expectiminimax over the two active mons: each turn we pick a move, the opponent answers with
+#whichever of theirs is worst for us, then accuracy/crit/roll chance nodes play out in speed order.
+#a policy(attacker, defender, state) for run_battle, so it can replace choose_best_move on either side.
+#
+#the model only tracks the two hp values. damage comes from damage.py at the root state (weather,
+#stat drops, status boosts as they are right now), status moves do nothing, and switching is still
+#should_switch's call. moves that come out even (like two status moves) go to choose_best_move.
+#
+#searches 1 turn, then 2, and so on up to max_depth, keeping the best move of the deepest turn count
+#it finished inside time_budget seconds. time_budget=None always goes to max_depth, which is the
+#setting to use when results have to be repeatable
+class ExpectiminimaxPolicy:
+    def __init__(self, max_depth=3, time_budget=0.002, table_size=1 << 20):
+        self.max_depth = max_depth
+        self.time_budget = time_budget
+        self.table_size = table_size
+        #(context id, our hp, their hp, turns left) -> value, shared across decisions and games
+        self.table = {}
+        #the damage matchup of a decision -> small int, so table keys stay small and cheap to hash
+        self._contexts = {}
+        self.decisions = 0
+        self.depth_total = 0
+        self.nodes = 0
+        self.table_hits = 0
+        self.seconds = 0.0
+
+    def __call__(self, attacker, defender, state):
+        start = perf_counter()
+        greedy = cached_best_move(attacker, defender, state.turn, attacker.hp / 100)
+        weather = state.weather
+        mine = tuple(damage_distribution(attacker, defender, m, weather) for m in attacker.moves)
+        theirs = tuple(damage_distribution(defender, attacker, m, weather) for m in defender.moves)
+        our_speed = modify_speed(attacker, weather, attacker.ability_effect)
+        their_speed = modify_speed(defender, weather, defender.ability_effect)
+        #speed ties go to the enemy in run_battle
+        we_first = our_speed > their_speed if attacker.side == PLAYER else our_speed >= their_speed
+
+        #bounded by starting over, context ids go with it since the table is what uses them
+        if len(self.table) > self.table_size:
+            self.table.clear()
+            self._contexts.clear()
+        context = (we_first, mine, theirs)
+        context_id = self._contexts.get(context)
+        if context_id is None:
+            context_id = self._contexts[context] = len(self._contexts)
+
+        self._deadline = None if self.time_budget is None else start + self.time_budget
+        self._context_id = context_id
+        self._we_first = we_first
+        #outcome lists per move, filled in per target hp as the search needs them
+        self._mine = [(dist, {}) for dist in mine]
+        self._theirs = [(dist, {}) for dist in theirs]
+
+        best_move, depth = greedy, 0
+        try:
+            for turns in range(1, self.max_depth + 1):
+                best_move = self._root(attacker.moves, greedy, attacker.hp, defender.hp, turns)
+                depth = turns
+        except _OutOfTime:
+            pass
+
+        self.decisions += 1
+        self.depth_total += depth
+        self.seconds += perf_counter() - start
+        return best_move
+
+    def _root(self, moves, greedy, our_hp, their_hp, turns):
+        values = [self._move_value(i, our_hp, their_hp, turns, float('-inf')) for i in range(len(moves))]
+        best = max(values)
+        #greedy's pick wins ties, so a board with nothing to hit with plays like it always did
+        for move, value in zip(moves, values):
+            if move == greedy and value >= best - 1e-9:
+                return move
+        return moves[values.index(best)]
+
+    #value of us using our move i, against the opponent's best answer. stops early once the
+    #answer is already no better than alpha, since then the move won't be picked anyway
+    def _move_value(self, i, our_hp, their_hp, turns, alpha):
+        ours = self._hits(self._mine[i], their_hp)
+        worst = float('inf')
+        for j in range(len(self._theirs)):
+            value = self._turn(ours, j, our_hp, their_hp, turns)
+            if value < worst:
+                worst = value
+                if worst <= alpha:
+                    break
+        return worst
+
+    def _value(self, our_hp, their_hp, turns):
+        key = (self._context_id, our_hp, their_hp, turns)
+        value = self.table.get(key)
+        if value is not None:
+            self.table_hits += 1
+            return value
+        self.nodes += 1
+        if self._deadline is not None and perf_counter() > self._deadline:
+            raise _OutOfTime
+        best = float('-inf')
+        for i in range(len(self._mine)):
+            value = self._move_value(i, our_hp, their_hp, turns, best)
+            if value > best:
+                best = value
+        self.table[key] = best
+        return best
+
+    def _hits(self, move, hp):
+        dist, by_hp = move
+        outcomes = by_hp.get(hp)
+        if outcomes is None:
+            outcomes = by_hp[hp] = _outcomes(dist, hp)
+        return outcomes
+
+    #one turn with both moves picked: faster mon hits, then the other one if it's still standing
+    def _turn(self, ours, j, our_hp, their_hp, turns):
+        total = 0.0
+        if self._we_first:
+            for chance, damage in ours:
+                hp = their_hp - damage
+                if hp <= 0:
+                    total += chance * self._leaf(our_hp, 0)
+                    continue
+                for chance2, damage2 in self._hits(self._theirs[j], our_hp):
+                    total += chance * chance2 * self._next(our_hp - damage2, hp, turns)
+        else:
+            for chance, damage in self._hits(self._theirs[j], our_hp):
+                hp = our_hp - damage
+                if hp <= 0:
+                    total += chance * self._leaf(0, their_hp)
+                    continue
+                for chance2, damage2 in ours:
+                    total += chance * chance2 * self._next(hp, their_hp - damage2, turns)
+        return total
+
+    def _next(self, our_hp, their_hp, turns):
+        if our_hp <= 0 or their_hp <= 0 or turns == 1:
+            return self._leaf(max(0, our_hp), max(0, their_hp))
+        return self._value(our_hp, their_hp, turns - 1)
+
+    @staticmethod
+    def _leaf(our_hp, their_hp):
+        value = (our_hp - their_hp) / 100
+        if their_hp == 0:
+            value += KO_BONUS
+        elif our_hp == 0:
+            value -= KO_BONUS
+        return value
+
+    def report(self):
+        decisions = self.decisions or 1
+        looked_up = self.nodes + self.table_hits or 1
+        return (f"{self.decisions} decisions, {self.seconds / decisions * 1e3:.2f} ms each, "
+                f"average depth {self.depth_total / decisions:.2f}, {self.nodes / decisions:.0f} nodes each, "
+                f"table hit rate {self.table_hits / looked_up:.1%}, {len(self.table)} entries")
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from tournament import run_tournament
+
+    parser = argparse.ArgumentParser(description="Expectiminimax (player side) against the greedy AI.")
+    parser.add_argument("--games", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=2.0, help="per decision, 0 for fixed depth")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    greedy, _ = run_tournament(args.games, workers=1, seed=args.seed)
+    greedy_time = time.perf_counter() - start
+
+    policy = ExpectiminimaxPolicy(args.depth, args.budget_ms / 1e3 or None)
+    start = time.perf_counter()
+    searched, _ = run_tournament(args.games, workers=1, seed=args.seed, policies=(policy, None))
+    search_time = time.perf_counter() - start
+
+    print(f"greedy vs greedy: {greedy} ({args.games / greedy_time:.0f} battles/s)")
+    print(f"search vs greedy: {searched} ({args.games / search_time:.0f} battles/s)")
+    print(policy.report())
@@ -0,0 +1,52 @@
+import numpy as np
+
+from pokemon import STAT_KEYS
+
+#battle factory sets are all level 50, and with 31 ivs the Speed column in L50R1P.csv comes out right
+LEVEL = 50
+DEFAULT_IV = 31
+
+#nature -> (stat it raises, stat it lowers), the neutral ones aren't listed
+NATURES = {
+    'Lonely': ('atk', 'def'), 'Brave': ('atk', 'spe'), 'Adamant': ('atk', 'spa'), 'Naughty': ('atk', 'spd'),
+    'Bold': ('def', 'atk'), 'Relaxed': ('def', 'spe'), 'Impish': ('def', 'spa'), 'Lax': ('def', 'spd'),
+    'Timid': ('spe', 'atk'), 'Hasty': ('spe', 'def'), 'Jolly': ('spe', 'spa'), 'Naive': ('spe', 'spd'),
+    'Modest': ('spa', 'atk'), 'Mild': ('spa', 'def'), 'Quiet': ('spa', 'spe'), 'Rash': ('spa', 'spd'),
+    'Calm': ('spd', 'atk'), 'Gentle': ('spd', 'def'), 'Sassy': ('spd', 'spe'), 'Careful': ('spd', 'spa'),
+}
+
+#nature multipliers in tenths, row 0 is neutral, then one row per nature: 11 raised, 9 lowered, 10 otherwise
+NATURE_IDS = {nature: i for i, nature in enumerate(NATURES, 1)}
+NATURE_TENTHS = np.full((len(NATURES) + 1, len(STAT_KEYS)), 10, dtype=np.int64)
+for nature, (up, down) in NATURES.items():
+    NATURE_TENTHS[NATURE_IDS[nature], STAT_KEYS.index(up)] = 11
+    NATURE_TENTHS[NATURE_IDS[nature], STAT_KEYS.index(down)] = 9
+
+#unknown natures (and the neutral ones) get row 0
+def nature_tenths(natures):
+    return NATURE_TENTHS[np.array([NATURE_IDS.get(n, 0) for n in natures], dtype=np.intp)]
+
+#ev spreads like ' 0 /255/ 0 / 0 / 0 /255', hp/atk/def/spa/spd/spe. anything that isn't 6 numbers counts as no evs
+def parse_ev_spreads(spreads):
+    evs = np.zeros((len(spreads), len(STAT_KEYS)), dtype=np.int64)
+    for i, spread in enumerate(spreads):
+        if not isinstance(spread, str):
+            continue
+        parts = spread.split('/')
+        if len(parts) != len(STAT_KEYS):
+            continue
+        try:
+            evs[i] = [int(p) for p in parts]
+        except ValueError:
+            pass
+    return evs
+
+#gen 3 stat formula for a whole set file at once, every argument is one row per set:
+#  hp = (2*base + iv + ev//4) * level // 100 + level + 10
+#  other = ((2*base + iv + ev//4) * level // 100 + 5) * nature, rounded down
+def calc_stats(base, evs, natures, ivs=DEFAULT_IV, level=LEVEL):
+    base = np.asarray(base, dtype=np.int64)
+    core = (2 * base + ivs + np.asarray(evs, dtype=np.int64) // 4) * level // 100
+    stats = (core + 5) * nature_tenths(natures) // 10
+    stats[:, 0] = core[:, 0] + level + 10
+    return stats
@@ -0,0 +1,112 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sampler import load_sampler
+from script import FULL, SILENT, run_battle
+
+WINNERS = ("player", "enemy", "draw")
+WINNER_CODES = {w: i for i, w in enumerate(WINNERS)}
+
+#each worker loads the roster once and keeps it around
+_sampler = None
+
+def _init_worker(roster_path):
+    global _sampler
+    _sampler = load_sampler((roster_path,))
+
+#every game gets its own rng from (master seed, game index),
+#so it doesn't matter which worker ends up playing it, and any one game can be replayed alone
+def game_rng(seed, index):
+    return random.Random(f"{seed}:{index}")
+
+#a random.Random that also writes down every draw the battle takes, as (method, args, result)
+class RecordingRandom(random.Random):
+    def __init__(self, seed=None):
+        self.draws = []
+        super().__init__(seed)
+
+    #only here so randint keeps using getrandbits like a plain Random does. a subclass that
+    #overrides random() alone gets switched to a random()-based randint and rolls differently
+    def getrandbits(self, k):
+        return super().getrandbits(k)
+
+    def random(self):
+        x = super().random()
+        self.draws.append(('random', (), x))
+        return x
+
+    #same as Random.uniform but without it also showing up as a random() draw
+    def uniform(self, a, b):
+        x = a + (b - a) * super().random()
+        self.draws.append(('uniform', (a, b), x))
+        return x
+
+    def randint(self, a, b):
+        x = super().randint(a, b)
+        self.draws.append(('randint', (a, b), x))
+        return x
+
+#teams follow the factory rules: no species or item twice in a team, and no species on both sides
+def game_teams(seed, index):
+    rng = np.random.default_rng((seed, index))
+    player = _sampler.draw(1, 3, rng)
+    enemy = _sampler.draw(1, 3, rng, exclude_species=_sampler.species_ids[0][player])
+    return _sampler.team(player[0]), _sampler.team(enemy[0])
+
+#policies that keep state between decisions (like MCTSPolicy) can have a start_game(seed, index),
+#called before every game so the game plays the same whichever chunk or worker it lands in
+def _start_game(policies, seed, index):
+    for policy in policies or ():
+        start_game = getattr(policy, "start_game", None)
+        if start_game:
+            start_game(seed, index)
+
+def _play_games(start, stop, seed, policies=None):
+    codes = bytearray()
+    for i in range(start, stop):
+        player_team, enemy_team = game_teams(seed, i)
+        _start_game(policies, seed, i)
+        codes.append(WINNER_CODES[run_battle(player_team, enemy_team, verbosity=SILENT, rng=game_rng(seed, i),
+                                             policies=policies)])
+    return start, bytes(codes)
+
+def _chunks(n_games, n_chunks):
+    size = max(1, -(-n_games // n_chunks))
+    return [(start, min(start + size, n_games)) for start in range(0, n_games, size)]
+
+#policies goes to run_battle as is (each worker gets its own copy). a policy with a time budget
+#can decide differently from run to run, give it a fixed depth if the results have to repeat
+def run_tournament(n_games, workers=None, seed=0, roster_path="L50R1P.csv", policies=None):
+    workers = workers or os.cpu_count() or 1
+    results = {w: 0 for w in WINNERS}
+    codes = bytearray(n_games)
+
+    if workers == 1:
+        _init_worker(roster_path)
+        parts = [_play_games(0, n_games, seed, policies)]
+    else:
+        #a few chunks per worker so a slow chunk doesn't hold everyone up
+        chunks = _chunks(n_games, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(roster_path,)) as pool:
+            parts = list(pool.map(_play_games, *zip(*chunks), [seed] * len(chunks), [policies] * len(chunks)))
+
+    for start, part in parts:
+        codes[start:start + len(part)] = part
+
+    results_log = [WINNERS[c] for c in codes]
+    for winner in results_log:
+        results[winner] += 1
+    return results, results_log
+
+#plays game index of run_tournament(..., seed) again on its own, same teams and same rolls.
+#returns (winner, draws) where draws is every random draw it made, in order
+def replay_game(index, seed=0, roster_path="L50R1P.csv", verbosity=FULL, events=None, policies=None):
+    _init_worker(roster_path)
+    player_team, enemy_team = game_teams(seed, index)
+    _start_game(policies, seed, index)
+    rng = RecordingRandom(f"{seed}:{index}")
+    winner = run_battle(player_team, enemy_team, verbosity=verbosity, events=events, rng=rng, policies=policies)
+    return winner, rng.draws
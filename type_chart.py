@@ -1,3 +1,5 @@
+import numpy as np
+
 type_chart = {
     'Normal': {
         'Rock': 0.5, 'Ghost': 0.0, 'Steel': 0.5
@@ -67,3 +69,43 @@ type_chart = {
         'Fighting': 0.5, 'Dark': 0.5, 'Steel': 0.5
     }
 }
+
+#integer type ids, ??? is gen 3's typeless type and also where unknown type names end up
+TYPES = [
+    'Normal', 'Fighting', 'Flying', 'Poison', 'Ground', 'Rock', 'Bug', 'Ghost', 'Steel',
+    'Fire', 'Water', 'Grass', 'Electric', 'Psychic', 'Ice', 'Dragon', 'Dark', '???'
+]
+TYPE_IDS = {t: i for i, t in enumerate(TYPES)}
+NO_TYPE = TYPE_IDS['???']
+
+def type_id(name):
+    return TYPE_IDS.get(name, NO_TYPE)
+
+#TYPE_MATRIX[attacking, defending], anything missing from type_chart is neutral
+TYPE_MATRIX = np.ones((len(TYPES), len(TYPES)), dtype=np.float32)
+for attacking, row in type_chart.items():
+    for defending, multiplier in row.items():
+        TYPE_MATRIX[TYPE_IDS[attacking], TYPE_IDS[defending]] = multiplier
+
+#DUAL_MATRIX[attacking, type_1, type_2] is the combined multiplier, mono types use type_2 = NO_TYPE
+DUAL_MATRIX = TYPE_MATRIX[:, :, None] * TYPE_MATRIX[:, None, :]
+
+#SE_MASKS[attacking] = bitmask of defending type ids it hits for 2x
+SE_MASKS = [sum(1 << d for d in range(len(TYPES)) if TYPE_MATRIX[a, d] == 2.0) for a in range(len(TYPES))]
+
+def type_mask(types):
+    mask = 0
+    for t in types:
+        mask |= 1 << type_id(t)
+    return mask
+
+#plain nested lists of the same numbers, indexing these from python is a lot cheaper than numpy scalars
+TYPE_EFF = TYPE_MATRIX.tolist()
+
+def defending_type_ids(types):
+    ids = [type_id(t) for t in types][:2]
+    return tuple(ids + [NO_TYPE] * (2 - len(ids)))
+
+#scores a whole array of move types against one defender in one go
+def move_effectiveness(move_type_ids, defender_type_ids):
+    return DUAL_MATRIX[np.asarray(move_type_ids), defender_type_ids[0], defender_type_ids[1]]